@@ -0,0 +1,83 @@
+import os  # For path operations
+import hashlib  # For content-addressed file names
+import threading  # Guards the index
+from collections import OrderedDict  # Least-recently-used order of cached clips
+
+class AudioCache:
+    """Size-bounded LRU cache of synthesized speech on disk.
+
+    Clips are stored as <sha256>.mp3, named after the text and the voice
+    settings used to speak it, so the same phrase is only synthesized once.
+    Recency survives restarts through file modification times, which are
+    refreshed on every hit.
+    """
+
+    def __init__(self, Directory, MaxBytes):
+        self.Directory = Directory
+        self.MaxBytes = MaxBytes
+        self.Hits = 0
+        self.Misses = 0
+        self._sizes = OrderedDict()  # File name -> size in bytes, oldest first
+        self._total = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(Directory, exist_ok=True)
+        Files = [e for e in os.scandir(Directory) if e.name.endswith(".mp3")]
+        for Entry in sorted(Files, key=lambda e: e.stat().st_mtime):
+            self._sizes[Entry.name] = Entry.stat().st_size
+            self._total += self._sizes[Entry.name]
+
+    @staticmethod
+    def Key(Text, Voice, Pitch, Rate):
+        return hashlib.sha256("\0".join([Text, Voice, Pitch, Rate]).encode("utf-8")).hexdigest()
+
+    def __contains__(self, Key):
+        return f"{Key}.mp3" in self._sizes
+
+    def Get(self, Key):
+        Name = f"{Key}.mp3"
+        Path = os.path.join(self.Directory, Name)
+        with self._lock:
+            if Name not in self._sizes:
+                self.Misses += 1
+                return None
+            try:
+                with open(Path, "rb") as f:
+                    Audio = f.read()
+                os.utime(Path)
+            except OSError:
+                self._total -= self._sizes.pop(Name)
+                self.Misses += 1
+                return None
+            self._sizes.move_to_end(Name)
+            self.Hits += 1
+            return Audio
+
+    def Put(self, Key, Audio):
+        Name = f"{Key}.mp3"
+        Path = os.path.join(self.Directory, Name)
+        with self._lock:
+            with open(f"{Path}.tmp", "wb") as f:
+                f.write(Audio)
+            os.replace(f"{Path}.tmp", Path)
+            self._total += len(Audio) - self._sizes.get(Name, 0)
+            self._sizes[Name] = len(Audio)
+            self._sizes.move_to_end(Name)
+            while self._total > self.MaxBytes and len(self._sizes) > 1:
+                Oldest, Size = self._sizes.popitem(last=False)
+                self._total -= Size
+                try:
+                    os.remove(os.path.join(self.Directory, Oldest))
+                except OSError:
+                    pass
+
+    def Stats(self):
+        with self._lock:
+            Lookups = self.Hits + self.Misses
+            return {
+                "clips": len(self._sizes),
+                "bytes": self._total,
+                "hits": self.Hits,
+                "misses": self.Misses,
+                "hit_rate": self.Hits / Lookups if Lookups else 0.0,
+            }
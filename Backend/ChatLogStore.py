@@ -0,0 +1,108 @@
+import os  # For path operations
+import json  # For encoding one message per line
+import threading  # Shared lock between the chat engines
+from collections import deque  # Cached tail window
+from dotenv import dotenv_values  # For reading environment variables
+
+# Load environment variables.
+env_vars = dotenv_values(".env")
+
+# Number of most recent messages kept in memory for prompt building.
+ChatLogTailSize = int(env_vars.get("ChatLogTailSize", 50))
+
+ChatLogPath = os.path.join("Data", "ChatLog.jsonl")
+LegacyChatLogPath = os.path.join("Data", "ChatLog.json")
+
+class ChatLogStore:
+    """Append-only chat history stored as JSON Lines.
+
+    Each message is one line, so appending a turn costs O(1) instead of
+    rewriting the whole log. Line offsets are indexed once at startup, which
+    lets callers read any page of history without parsing the rest, and the
+    last TailSize messages are cached in memory for building prompts. All
+    reads and writes go through Lock, which ChatBot and RealtimeSearchEngine
+    share.
+    """
+
+    def __init__(self, Path=ChatLogPath, LegacyPath=LegacyChatLogPath, TailSize=ChatLogTailSize):
+        self.Path = Path
+        self.Lock = threading.RLock()
+        self._offsets = []
+        self._tail = deque(maxlen=TailSize)
+
+        os.makedirs(os.path.dirname(Path) or ".", exist_ok=True)
+        if not os.path.exists(Path):
+            self._migrate(LegacyPath)
+        self._index()
+
+    def _migrate(self, LegacyPath):
+        """One-time import of the old whole-file Data/ChatLog.json."""
+        Messages = []
+        if LegacyPath and os.path.exists(LegacyPath):
+            try:
+                with open(LegacyPath, "r", encoding="utf-8") as f:
+                    Messages = json.load(f)
+            except ValueError:
+                Messages = []
+        with open(self.Path, "w", encoding="utf-8") as f:
+            for Message in Messages:
+                f.write(json.dumps(Message, ensure_ascii=False) + "\n")
+
+    def _index(self):
+        Offset = 0
+        with open(self.Path, "rb") as f:
+            for Line in f:
+                if Line.strip():
+                    self._offsets.append(Offset)
+                    self._tail.append(json.loads(Line))
+                Offset += len(Line)
+
+    def Extend(self, Messages):
+        """Append messages (e.g. a user/assistant turn) in a single write."""
+        with self.Lock:
+            with open(self.Path, "ab") as f:
+                Offset = f.seek(0, os.SEEK_END)
+                for Message in Messages:
+                    Line = (json.dumps(Message, ensure_ascii=False) + "\n").encode("utf-8")
+                    f.write(Line)
+                    self._offsets.append(Offset)
+                    self._tail.append(Message)
+                    Offset += len(Line)
+
+    def Append(self, Role, Content):
+        self.Extend([{"role": Role, "content": Content}])
+
+    def Tail(self, Count=None):
+        """Return the last Count messages (all cached ones by default)."""
+        with self.Lock:
+            if Count is None:
+                return list(self._tail)
+            if Count <= len(self._tail):
+                return list(self._tail)[len(self._tail) - Count:]
+            return self.Page(max(len(self._offsets) - Count, 0), len(self._offsets))
+
+    def Page(self, Start, Stop):
+        """Return messages Start..Stop-1 by seeking straight to their lines."""
+        with self.Lock:
+            Page = []
+            with open(self.Path, "rb") as f:
+                for Offset in self._offsets[Start:Stop]:
+                    f.seek(Offset)
+                    Page.append(json.loads(f.readline()))
+            return Page
+
+    def Messages(self):
+        return self.Page(0, len(self))
+
+    def Clear(self):
+        with self.Lock:
+            with open(self.Path, "w", encoding="utf-8"):
+                pass
+            self._offsets.clear()
+            self._tail.clear()
+
+    def __len__(self):
+        return len(self._offsets)
+
+# Shared chat log used by every engine.
+ChatLog = ChatLogStore()
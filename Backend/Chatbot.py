@@ -1,22 +1,25 @@
-from groq import Groq  # Importing the Groq library to use its API.
-from json import load, dump  # Importing functions to read and write JSON files.
+from Backend.LLMGateway import ChatStream  # Importing the shared, pooled LLM client.
+from Backend.ChatLogStore import ChatLog  # Importing the shared append-only chat log.
+from Backend.ContextWindow import Context  # Importing the token-budgeted context builder.
+from Backend.LLMGateway import DefaultModel  # Importing the model name that answers general queries.
+from Backend.PersistentCache import PersistentCache  # Importing the LRU+TTL cache for repeated answers.
+from Backend.SemanticCache import SemanticCache  # Importing the cache that matches reworded questions.
+from Backend.Tracing import Traced  # Importing span tracing for latency and token metrics.
+from Backend.IntentClassifier import Normalize  # Importing query normalization for cache keys.
 import datetime  # Importing datetime module for real-time date and time information.
+import hashlib  # Importing hashlib to build response cache keys.
+import json  # Importing json to serialize cache key parts.
+import os  # Importing os for the cache file path.
+import re  # Importing re to spot time-sensitive and follow-up queries.
 from dotenv import dotenv_values  # Importing dotenv_values to read environment variables from a .env file.
 
 
 # Load environment variables from the .env file.
 env_vars = dotenv_values(".env")
 
-# Retrieve specific environment variables for username, assistant name, and API key.
+# Retrieve specific environment variables for username and assistant name.
 Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
-GroqAPIKey = env_vars.get("GroqAPIKey")
-
-# Initialize the Groq client using the provided API key.
-client = Groq(api_key=GroqAPIKey)
-
-# Initialize an empty list to store chat messages.
-messages = []
 
 # Define a system message that provides context to the AI chatbot about its role and behavior.
 System = f"""Hello, I am {Username}, You are a very accurate and advanced AI chatbot named {Assistantname} which also has real-time up-to-date information from the internet.
@@ -30,14 +33,20 @@ SystemChatBot = [
     {"role": "system", "content": System}
 ]
 
-# Attempt to load the chat log from a JSON file.
-try:
-    with open(r"Data/ChatLog.json", "r", encoding="utf-8") as f:  # Fixed escape sequences
-        messages = load(f)  # Load existing messages from the chat log.
-except FileNotFoundError:
-    # If the file doesn't exist, create an empty JSON file to store chat logs.
-    with open(r"Data/ChatLog.json", "w", encoding="utf-8") as f:
-        dump([], f)
+# Opt-in cache of answers to repeated general questions ("who are you", "tell me a joke").
+ResponseCacheEnabled = env_vars.get("ResponseCache", "False").lower() == "true"
+ResponseCacheSize = int(env_vars.get("ResponseCacheSize", 256))
+ResponseCacheTTL = int(env_vars.get("ResponseCacheTTL", 24 * 3600))
+ResponseCache = PersistentCache(os.path.join("Data", "ResponseCache.json"), MaxEntries=ResponseCacheSize, TTL=ResponseCacheTTL) if ResponseCacheEnabled else None
+# Answers to standalone questions, also found when the question is reworded.
+SimilarQuestions = SemanticCache(MaxEntries=ResponseCacheSize, TTL=ResponseCacheTTL) if ResponseCacheEnabled else None
+
+# Questions whose answer depends on the current date or time are never cached.
+TimeSensitive = re.compile(r"\b(time|date|today|tonight|now|day|week|month|year|tomorrow|yesterday|current|latest|age|old)\b", re.I)
+# Answers that state a clock time or weekday were built from RealtimeInformation().
+TimeInAnswer = re.compile(r"\b\d{1,2}:\d{2}\b|\b\d{1,2} hours\b|\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", re.I)
+# Follow-up questions refer to the previous exchange, so it becomes part of their cache key.
+FollowUp = re.compile(r"\b(it|its|that|this|those|these|he|she|him|her|his|they|them|their|more|again|else|another|previous|above)\b", re.I)
 
 # Function to get real-time date and time information.
 def RealtimeInformation():
@@ -63,53 +72,83 @@ def AnswerModifier(Answer):
     modified_answer = '\n'.join(non_empty_lines)  # Join the cleaned lines back together.
     return modified_answer
 
-# Main chatbot function to handle user queries.
-def ChatBot(Query):
-    """ This function sends the user's query to the chatbot and returns the AI's response. """
+# Function to build the response cache key, or None for queries that must not be cached.
+def ResponseCacheKey(Query, messages):
+    if ResponseCache is None or TimeSensitive.search(Query):
+        return None
+    # Only a follow-up question depends on the conversation; standalone ones share an entry.
+    Recent = [m for m in messages[len(SystemChatBot) + 1:-1] if m["role"] != "system"][-2:] if FollowUp.search(Query) else []
+    Parts = [
+        DefaultModel,
+        hashlib.sha256(System.encode("utf-8")).hexdigest(),
+        Normalize(Query),
+        hashlib.sha256(json.dumps(Recent, sort_keys=True).encode("utf-8")).hexdigest(),
+    ]
+    return hashlib.sha256("\0".join(Parts).encode("utf-8")).hexdigest()
+
+# Function to replay a cached answer in word-sized pieces, like a live stream.
+def ReplayAnswer(Answer):
+    return re.findall(r"\S+\s*", Answer)
+
+# Streaming chatbot function that yields the AI's response token by token.
+@Traced("chat")
+def ChatBotStream(Query):
+    """ This function sends the user's query to the chatbot and yields the AI's response as it is generated. """
+    Answer = ""
     try:
-        # Load the existing chat log from the JSON file.
-        with open(r"Data/ChatLog.json", "r", encoding="utf-8") as f:
-            messages = load(f)
-
-        # Append the user's query to the messages list.
-        messages.append({"role": "user", "content": f"{Query}"})
-
-        # Make a request to the Groq API for a response.
-        completion = client.chat.completions.create(
-            model="llama3-70b-8192",  # Specify the AI model to use.
-            messages=SystemChatBot + [{"role": "system", "content": RealtimeInformation()}] + messages,  # Include system instructions and user query.
+        # Build the user's query message.
+        UserMessage = {"role": "user", "content": f"{Query}"}
+
+        # Fit the system instructions, recent chat history and the query into the token budget.
+        messages = Context.Build(SystemChatBot + [{"role": "system", "content": RealtimeInformation()}], UserMessage, MaxTokens=1024)
+
+        # Serve a repeated question from the response cache; it still streams into TTS like a live answer.
+        CacheKey = ResponseCacheKey(Query, messages)
+        Standalone = CacheKey is not None and not FollowUp.search(Query)
+        Cached = ResponseCache.Get(CacheKey) if CacheKey else None
+        if Cached is None and Standalone:
+            Cached = SimilarQuestions.Get(Query)
+        if Cached is not None:
+            for Token in ReplayAnswer(Cached):
+                Answer += Token
+                yield Token
+            ChatLog.Extend([UserMessage, {"role": "assistant", "content": Answer}])
+            return
+
+        # Stream the response through the gateway, which retries and falls back to a smaller model.
+        for Token in ChatStream(
+            messages,  # Include system instructions, history and user query.
+            Name="chatbot",  # Label for the gateway's latency and token metrics.
             max_tokens=1024,  # Limit the maximum tokens in the response.
             temperature=0.7,  # Adjust response randomness (higher means more random).
             top_p=1,  # Use nucleus sampling to control diversity.
-            stream=True  # Enable streaming response.
-        )
-
-        # Initialize the Answer variable.
-        Answer = ""
+        ):
+            Token = Token.replace("</s>", "")  # Clean up any unwanted tokens.
+            Answer += Token  # Append the content to the answer.
+            yield Token
 
-        # Process the streamed response chunks.
-        for chunk in completion:
-            if chunk.choices[0].delta.content:  # Check if there's content in the current chunk.
-                Answer += chunk.choices[0].delta.content  # Append the content to the answer.
+        # Append the query and the chatbot's response to the chat log.
+        ChatLog.Extend([UserMessage, {"role": "assistant", "content": Answer}])
 
-        Answer = Answer.replace("</s>", "")  # Clean up any unwanted tokens from the response.
-
-        # Append the chatbot's response to the messages list.
-        messages.append({"role": "assistant", "content": Answer})
-
-        # Save the updated chat log to the JSON file.
-        with open(r"Data/ChatLog.json", "w", encoding="utf-8") as f:
-            dump(messages, f, indent=4)
-
-        # Return the formatted response.
-        return AnswerModifier(Answer)
+        # Remember the answer unless it was built from the current date or time.
+        if CacheKey and Answer.strip() and not TimeInAnswer.search(Answer):
+            ResponseCache.Put(CacheKey, Answer)
+            if Standalone:
+                SimilarQuestions.Put(Query, Answer)
 
     except Exception as e:
-        # Handle errors by printing the exception and resetting the chat log.
+        # The gateway has already retried; keep the chat log and tell the user.
         print(f"Error: {e}")
-        with open(r"Data/ChatLog.json", "w", encoding="utf-8") as f:
-            dump([], f)  # Reset the chat log.
-        return ChatBot(Query)  # Retry the query after resetting the log.
+        if not Answer:
+            yield "Sorry, I couldn't reach the language model. Please try again."
+
+# Main chatbot function to handle user queries.
+def ChatBot(Query):
+    """ This function sends the user's query to the chatbot and returns the AI's response. """
+    Answer = "".join(ChatBotStream(Query))  # Drain the streamed response into a single answer.
+
+    # Return the formatted response.
+    return AnswerModifier(Answer)
 
 # Main program entry point.
 if __name__ == "__main__":
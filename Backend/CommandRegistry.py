@@ -0,0 +1,143 @@
+import time  # For handler latencies
+import asyncio  # Commands run on the caller's event loop
+import logging  # For failed handlers
+import threading  # Guards metrics and pool creation
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor  # Shared pools for blocking handlers
+from dotenv import dotenv_values  # For reading environment variables
+from Backend.TaskDispatcher import CommandTimeout  # Default time a command may take
+
+# Load environment variables
+env_vars = dotenv_values(".env")
+
+CommandWorkers = int(env_vars.get("CommandWorkers", 8))  # Threads for I/O-bound handlers
+CommandProcesses = int(env_vars.get("CommandProcesses", 2))  # Processes for CPU-bound handlers
+
+Kinds = ("io", "cpu", "async")
+
+class CommandHandler:
+    """The function carrying out commands that start with Prefix.
+
+    Kind says how it runs: "async" handlers are coroutines awaited on the
+    caller's loop, "io" handlers run on the shared thread pool and "cpu"
+    handlers on the shared process pool, so they must be module-level
+    functions. Every call is given up on after Timeout seconds. An Exact
+    handler only takes the command Prefix itself, with no argument.
+    """
+
+    def __init__(self, Prefix, Function, Kind="io", Timeout=CommandTimeout, Exact=False):
+        if Kind not in Kinds:
+            raise ValueError(f"Unknown handler kind {Kind!r}; expected one of {Kinds}")
+        self.Prefix = Prefix
+        self.Function = Function
+        self.Kind = Kind
+        self.Timeout = Timeout
+        self.Exact = Exact
+
+    def Matches(self, Command):
+        return Command == self.Prefix or (not self.Exact and Command.startswith(self.Prefix + " "))
+
+class CommandMetrics:
+    """Outcome and latency of recent command calls, grouped by handler prefix."""
+
+    def __init__(self, MaxCalls=500):
+        self.MaxCalls = MaxCalls
+        self.Calls = []
+        self._lock = threading.Lock()
+
+    def Record(self, **Call):
+        with self._lock:
+            self.Calls.append(Call)
+            del self.Calls[:-self.MaxCalls]
+
+    def Summary(self):
+        Groups = {}
+        with self._lock:
+            for Call in self.Calls:
+                Groups.setdefault(Call["name"], []).append(Call)
+        Summary = {}
+        for Name, Calls in Groups.items():
+            Latencies = sorted(c["latency"] for c in Calls)
+            Summary[Name] = {
+                "calls": len(Calls),
+                "errors": sum(1 for c in Calls if c["outcome"] == "error"),
+                "timeouts": sum(1 for c in Calls if c["outcome"] == "timeout"),
+                "p50_latency": Latencies[len(Latencies) // 2],
+                "p95_latency": Latencies[min(len(Latencies) - 1, int(len(Latencies) * 0.95))],
+            }
+        return Summary
+
+class CommandRegistry:
+    """Command handlers by prefix, run without blocking the caller's event loop.
+
+    A command goes to the handler with the longest matching prefix, so
+    "close youtube" can have its own handler next to "close", and the rest
+    of the command is passed to it as the argument.
+    """
+
+    def __init__(self, Workers=CommandWorkers, Processes=CommandProcesses):
+        self.Handlers = {}
+        self.Workers = Workers
+        self.Processes = Processes
+        self.Metrics = CommandMetrics()
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def Register(self, Prefix, Kind="io", Timeout=CommandTimeout, Exact=False):
+        """Decorator registering a function as the handler for commands starting with Prefix."""
+        def Decorate(Function):
+            self.Handlers[Prefix] = CommandHandler(Prefix, Function, Kind, Timeout, Exact)
+            return Function
+        return Decorate
+
+    def Find(self, Command):
+        """The handler for Command and the argument it gets, or (None, "")."""
+        Handler = max((h for h in self.Handlers.values() if h.Matches(Command)), key=lambda h: len(h.Prefix), default=None)
+        return Handler, Command[len(Handler.Prefix):].strip() if Handler else ""
+
+    def Pool(self, Kind):
+        with self._lock:
+            if Kind not in self._pools:
+                if Kind == "cpu":
+                    self._pools[Kind] = ProcessPoolExecutor(max_workers=self.Processes)
+                else:
+                    self._pools[Kind] = ThreadPoolExecutor(max_workers=self.Workers, thread_name_prefix="command")
+            return self._pools[Kind]
+
+    async def Offload(self, Function, *Args, Kind="io"):
+        """Run a blocking call from an async handler on the shared pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.Pool(Kind), Function, *Args)
+
+    async def Run(self, Command):
+        """Carry out one command and return its reply (None if it has none or failed)."""
+        Handler, Argument = self.Find(Command)
+        if Handler is None:
+            logging.error(f"No handler for command {Command!r}")
+            return None
+        Started = time.perf_counter()
+        Outcome = "ok"
+        try:
+            if Handler.Kind == "async":
+                Work = Handler.Function(Argument)
+            else:
+                Work = self.Offload(Handler.Function, Argument, Kind=Handler.Kind)
+            return await asyncio.wait_for(Work, Handler.Timeout)
+        except asyncio.TimeoutError:
+            Outcome = "timeout"
+            logging.error(f"Command {Command!r} timed out after {Handler.Timeout}s")
+            return f"Sorry, {Command} is taking too long."
+        except asyncio.CancelledError:
+            Outcome = "cancelled"
+            raise
+        except Exception as e:
+            Outcome = "error"
+            logging.error(f"Command {Command!r} failed: {e}")
+            return None
+        finally:
+            self.Metrics.Record(name=Handler.Prefix, latency=time.perf_counter() - Started, outcome=Outcome)
+
+    async def RunAll(self, Commands):
+        """Carry out Commands concurrently; replies come back in the same order."""
+        return await asyncio.gather(*(self.Run(Command) for Command in Commands))
+
+# Shared registry the command handlers add themselves to.
+Registry = CommandRegistry()
@@ -0,0 +1,119 @@
+import re  # For the token approximation
+import threading  # Guards the running summary
+from collections import deque  # Summary lines, oldest dropped first
+from functools import lru_cache  # Per-message token count cache
+from dotenv import dotenv_values  # For reading environment variables
+from Backend.ChatLogStore import ChatLog  # Shared chat history
+
+# Load environment variables.
+env_vars = dotenv_values(".env")
+
+# Context length of llama3-70b-8192 and the share of it prompts may use.
+ModelContextTokens = int(env_vars.get("ModelContextTokens", 8192))
+ContextTokenBudget = int(env_vars.get("ContextTokenBudget", 6000))
+SummaryTokenBudget = int(env_vars.get("SummaryTokenBudget", 400))
+SafetyMarginTokens = 64  # Headroom for the approximation and chat template tokens
+MessageOverheadTokens = 4  # Role and separator tokens added per message
+MinSummaryLineTokens = 3  # "User: x", the shortest line a message adds to the summary
+
+TokenPattern = re.compile(r"\w+|[^\w\s]")
+SentenceEnd = re.compile(r"(?<=[.!?])\s")
+
+@lru_cache(maxsize=8192)
+def CountTokens(Text):
+    """Approximate the BPE token count of Text without a tokenizer download.
+
+    Words and punctuation marks count as one token each, with long words
+    counted as several, which tracks llama3's tokenizer closely enough for
+    budgeting.
+    """
+    return sum(1 + len(Piece) // 8 for Piece in TokenPattern.findall(Text))
+
+def MessageTokens(Message):
+    return CountTokens(Message["content"]) + MessageOverheadTokens
+
+def ExtractiveSummary(Summary, Messages, Budget=SummaryTokenBudget):
+    """Fold Messages into Summary by keeping the first sentence of each one.
+
+    The oldest lines are dropped once the summary exceeds Budget tokens.
+    Tokens never span lines, so the total is kept as a running sum.
+    """
+    Lines = deque(Summary.split("\n") if Summary else [])
+    Total = sum(CountTokens(Line) for Line in Lines)
+    for Message in Messages:
+        First = SentenceEnd.split(Message["content"].strip(), maxsplit=1)[0]
+        Words = First.split()
+        if len(Words) > 30:
+            First = " ".join(Words[:30]) + " ..."
+        Speaker = "User" if Message["role"] == "user" else "Assistant"
+        Lines.append(f"{Speaker}: {First}")
+        Total += CountTokens(Lines[-1])
+        while len(Lines) > 1 and Total > Budget:
+            Total -= CountTokens(Lines.popleft())
+    return "\n".join(Lines)
+
+class ContextWindow:
+    """Builds prompts that fit a token budget from the shared chat log.
+
+    The newest messages are kept verbatim until the budget runs out. Messages
+    that fall out of the window are folded once into a running summary, so
+    long sessions keep a bounded prompt while the model still sees what was
+    discussed earlier.
+    """
+
+    def __init__(self, Store=ChatLog, Budget=ContextTokenBudget, SummaryBudget=SummaryTokenBudget, Summarizer=ExtractiveSummary):
+        self.Store = Store
+        self.Budget = Budget
+        self.SummaryBudget = SummaryBudget
+        self.Summarizer = Summarizer
+        self.Summary = ""
+        self._summarized = 0  # Absolute chat log index up to which messages are in Summary
+        self._lock = threading.Lock()
+
+    def SummaryMessages(self):
+        if not self.Summary:
+            return []
+        return [{"role": "system", "content": f"Summary of the earlier conversation:\n{self.Summary}"}]
+
+    def Build(self, System, Query, MaxTokens=1024):
+        """Return System + summary + recent history + Query within the token budget.
+
+        MaxTokens is the completion size requested from the model; it is
+        reserved out of the model context on top of the prompt budget.
+        """
+        Budget = min(self.Budget, ModelContextTokens - MaxTokens - SafetyMarginTokens)
+        with self.Store.Lock:
+            History = self.Store.Tail()
+            Offset = len(self.Store) - len(History)
+
+        with self._lock:
+            if Offset + len(History) < self._summarized:
+                # The chat log was cleared; start a fresh summary.
+                self.Summary, self._summarized = "", 0
+
+            Used = sum(MessageTokens(m) for m in System) + MessageTokens(Query) + self.SummaryBudget
+            Kept = 0
+            for Message in reversed(History):
+                Used += MessageTokens(Message)
+                if Used > Budget:
+                    break
+                Kept += 1
+
+            # Fold messages that just left the window into the summary.
+            Cut = Offset + len(History) - Kept
+            if Cut > self._summarized:
+                Dropped = History[max(self._summarized - Offset, 0):len(History) - Kept]
+                if self._summarized < Offset:
+                    # Messages that already left the cached tail are read back from the log,
+                    # but only as many as could still fit in the summary next to the newer ones.
+                    Start = max(self._summarized, Offset - self.SummaryBudget // MinSummaryLineTokens)
+                    if Start > self._summarized:
+                        self.Summary = ""  # Everything in it is older than what is skipped
+                    Dropped = self.Store.Page(Start, Offset) + Dropped
+                self.Summary = self.Summarizer(self.Summary, Dropped, self.SummaryBudget)
+                self._summarized = Cut
+
+            return System + self.SummaryMessages() + History[len(History) - Kept:] + [Query]
+
+# Context window shared by ChatBot and RealtimeSearchEngine.
+Context = ContextWindow()
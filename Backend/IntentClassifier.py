@@ -0,0 +1,107 @@
+import re  # For the routing patterns
+import threading  # Guards the hit/latency counters
+
+# Each rule maps a full-clause pattern to a decision template. "{0}" is the
+# first captured group with trailing punctuation removed, "{query}" the whole
+# normalized clause. Only unambiguous phrasings belong here; anything else is
+# left to the decision model in Model.FirstLayerDMM.
+# Optional time or place after a realtime phrasing; anything else after it goes to the model.
+WhenOrWhere = r"(?: (?:today|tonight|now|right now|tomorrow|this week|for (?:today|tonight|tomorrow|this week)|in [a-z ]+))?"
+Rules = [
+    (r"(?:bye|goodbye|good bye|exit|quit)(?: \w+)?", "exit"),
+    (r"(?:mute|unmute)", "system {query}"),
+    (r"(?:volume up|volume down|increase (?:the )?volume|decrease (?:the )?volume|turn (?:the )?volume (?:up|down))", "system {query}"),
+    (r"open (.+)", "open {0}"),
+    (r"close (.+)", "close {0}"),
+    (r"(?:google search|search google for) (.+)", "google search {0}"),
+    (r"search (?:for )?(.+) on google", "google search {0}"),
+    (r"(?:youtube search|search youtube for) (.+)", "youtube search {0}"),
+    (r"search (?:for )?(.+) on youtube", "youtube search {0}"),
+    (r"play (.+)", "play {0}"),
+    (r"(?:generate|create|make|draw) (?:an? )?(?:image|picture|photo) of (.+)", "generate image {0}"),
+    (r"(?:write|draft|compose) (?:me )?(?:an? )?(?:application|letter|essay|article|blog|email|poem|story)\b.*", "content {query}"),
+    (r"(?:what(?:'s| is) (?:the )?(?:time|date|day)(?: today| now| right now)?|what time is it(?: now)?|what day is (?:it|today)|tell me (?:the )?(?:time|date)|what is today's date)", "general {query}"),
+    (r"(?:hi|hello|hey|how are you|how are you doing|who are you|what(?:'s| is) your name|thank you|thanks|good (?:morning|afternoon|evening|night))(?: \w+)?", "general {query}"),
+    (rf"(?:what(?:'s| is) |tell me |show me |give me )(?:the )?(?:latest |today's |current )?(?:news|headlines|weather|temperature|forecast){WhenOrWhere}", "realtime {query}"),
+    (rf"(?:how is |how's )the weather{WhenOrWhere}", "realtime {query}"),
+    (rf"(?:the )?(?:latest |today's |current )?(?:news|headlines|weather){WhenOrWhere}", "realtime {query}"),
+]
+CompiledRules = [(re.compile(Pattern + r"$"), Template) for Pattern, Template in Rules]
+
+# Decisions whose argument is free text and may itself contain "and" or commas.
+FreeTextDecisions = ("content", "generate image")
+
+# Verbs that carry over to a bare name after "and", as in "open chrome and firefox".
+CarriedVerbs = ("open", "close")
+
+# Clauses that add nothing to a request, as in "open chrome, please".
+FillerClauses = {"please", "now", "right now", "thanks", "thank you"}
+
+ClauseSeparator = re.compile(r"(,\s*|\s+and\s+)")
+
+# Hit/latency counters for ClassifierStats().
+Stats = {"local": 0, "fallback": 0, "local_seconds": 0.0, "fallback_seconds": 0.0}
+StatsLock = threading.Lock()
+
+def Normalize(Text):
+    return re.sub(r"\s+", " ", Text.lower()).strip().strip(".?!")
+
+def ClassifyClause(Clause):
+    for Pattern, Template in CompiledRules:
+        Match = Pattern.match(Clause)
+        if Match:
+            Groups = [g.strip().strip(".?!") for g in Match.groups()]
+            return Template.format(*Groups, query=Clause)
+    return None
+
+def ClassifyLocally(Query):
+    """Return the decision list for Query, or None when it is not confidently routable.
+
+    Decisions use the same strings as the decision model, e.g.
+    "open chrome and firefox" -> ["open chrome", "open firefox"].
+    """
+    Text = Normalize(Query)
+    if not Text:
+        return None
+
+    Parts = ClauseSeparator.split(Text)
+    Clauses = list(zip(Parts[::2], [""] + Parts[1::2]))  # (clause, separator before it)
+    if len(Clauses) > 1:
+        Clauses = [(Clause, Separator) for Clause, Separator in Clauses if Clause not in FillerClauses] or Clauses
+
+    Decisions = []
+    for Clause, Separator in Clauses:
+        Decision = ClassifyClause(Clause)
+        Carried = Decisions and Decisions[-1].split()[0] in CarriedVerbs and Separator.strip() == "and"
+        if Decision is None and Carried and " " not in Clause:
+            Decision = f"{Decisions[-1].split()[0]} {Clause}"
+        if Decision is None:
+            break
+        Decisions.append(Decision)
+    else:
+        return Decisions
+
+    # Free-text tasks like "write a letter to john and mary" stay one task.
+    Decision = ClassifyClause(Text)
+    if Decision is not None and Decision.startswith(FreeTextDecisions):
+        return [Decision]
+    return None
+
+def RecordClassification(Local, Seconds):
+    Kind = "local" if Local else "fallback"
+    with StatsLock:
+        Stats[Kind] += 1
+        Stats[f"{Kind}_seconds"] += Seconds
+
+def ClassifierStats():
+    """Hit rate and average latency of the local classifier versus the model fallback."""
+    with StatsLock:
+        Total = Stats["local"] + Stats["fallback"]
+        return {
+            "queries": Total,
+            "local_hits": Stats["local"],
+            "fallbacks": Stats["fallback"],
+            "hit_rate": Stats["local"] / Total if Total else 0.0,
+            "avg_local_us": Stats["local_seconds"] / Stats["local"] * 1e6 if Stats["local"] else 0.0,
+            "avg_fallback_ms": Stats["fallback_seconds"] / Stats["fallback"] * 1e3 if Stats["fallback"] else 0.0,
+        }
@@ -0,0 +1,331 @@
+import json  # For the fake server's wire format
+import time  # For deadlines, backoff and latency metrics
+import random  # For backoff jitter
+import logging  # For error logging
+import threading  # Guards the shared clients and metrics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Local fake LLM server
+import httpx  # Pooled keep-alive HTTP client shared by every SDK
+from dotenv import dotenv_values  # For reading environment variables
+from Backend.ContextWindow import CountTokens  # Token estimates when the API reports no usage
+
+# Load environment variables
+env_vars = dotenv_values(".env")
+GroqAPIKey = env_vars.get("GroqAPIKey")
+CohereAPIKey = env_vars.get("CohereAPIKey")
+
+DefaultModel = env_vars.get("ChatModel", "llama3-70b-8192")
+# Smaller model used when the main one is rate limited, over its token budget or failing.
+FallbackModel = env_vars.get("FallbackModel", "llama3-8b-8192")
+LLMTimeout = float(env_vars.get("LLMTimeout", 30))  # Deadline in seconds for a whole call, retries included
+LLMRetries = int(env_vars.get("LLMRetries", 3))
+LLMBackoff = float(env_vars.get("LLMBackoff", 0.5))  # First retry delay in seconds; doubles each attempt
+MaxBackoff = 8.0
+# Point every client at a local fake server (see FakeLLMServer) instead of the real APIs.
+LLMFakeServer = env_vars.get("LLMFakeServer")
+
+# Status codes worth retrying; anything else (bad request, auth) fails at once.
+RetryableStatus = {408, 409, 429, 500, 502, 503, 504}
+# Status codes that mean the request is too big or too frequent for the current model.
+FallbackStatus = {413, 429}
+
+HttpClient = None
+Clients = {}
+ClientLock = threading.Lock()
+
+def GetHttpClient():
+    """One keep-alive connection pool shared by every LLM client."""
+    global HttpClient
+    with ClientLock:
+        if HttpClient is None:
+            HttpClient = httpx.Client(
+                timeout=httpx.Timeout(LLMTimeout, connect=5.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120),
+            )
+        return HttpClient
+
+def GroqClient():
+    if "groq" not in Clients:
+        from groq import Groq  # Imported on first use so tools that only need Cohere don't load it.
+        Http = GetHttpClient()
+        with ClientLock:
+            # Retries are done here, with one deadline across attempts and model fallback.
+            Clients.setdefault("groq", Groq(api_key=GroqAPIKey or "fake", base_url=LLMFakeServer, http_client=Http, max_retries=0))
+    return Clients["groq"]
+
+def CohereClient():
+    if "cohere" not in Clients:
+        import cohere  # Imported on first use, like GroqClient.
+        Http = GetHttpClient()
+        Options = {"base_url": LLMFakeServer} if LLMFakeServer else {}
+        with ClientLock:
+            Clients.setdefault("cohere", cohere.Client(api_key=CohereAPIKey or "fake", httpx_client=Http, **Options))
+    return Clients["cohere"]
+
+class CallMetrics:
+    """Latency and token counts of recent LLM calls, grouped by call name."""
+
+    def __init__(self, MaxCalls=500):
+        self.MaxCalls = MaxCalls
+        self.Calls = []
+        self._lock = threading.Lock()
+
+    def Record(self, **Call):
+        with self._lock:
+            self.Calls.append(Call)
+            del self.Calls[:-self.MaxCalls]
+
+    def Summary(self):
+        Groups = {}
+        with self._lock:
+            for Call in self.Calls:
+                Groups.setdefault(Call["name"], []).append(Call)
+        Summary = {}
+        for Name, Calls in Groups.items():
+            Latencies = sorted(c["latency"] for c in Calls)
+            FirstTokens = [c["ttft"] for c in Calls if c["ttft"] is not None]
+            Summary[Name] = {
+                "calls": len(Calls),
+                "errors": sum(1 for c in Calls if c["error"]),
+                "retries": sum(c["retries"] for c in Calls),
+                "fallbacks": sum(1 for c in Calls if c["model"] == FallbackModel),
+                "p50_latency": Latencies[len(Latencies) // 2],
+                "p95_latency": Latencies[min(len(Latencies) - 1, int(len(Latencies) * 0.95))],
+                "avg_ttft": sum(FirstTokens) / len(FirstTokens) if FirstTokens else None,
+                "prompt_tokens": sum(c["prompt_tokens"] for c in Calls),
+                "completion_tokens": sum(c["completion_tokens"] for c in Calls),
+            }
+        return Summary
+
+Metrics = CallMetrics()
+
+def Backoff(Attempt):
+    return min(MaxBackoff, LLMBackoff * 2 ** Attempt) * random.uniform(0.8, 1.2)
+
+def StatusOf(Error):
+    return getattr(Error, "status_code", None) or getattr(getattr(Error, "response", None), "status_code", None)
+
+def IsRetryable(Error):
+    Status = StatusOf(Error)
+    # No status means the connection failed or timed out.
+    return Status is None or Status in RetryableStatus
+
+class RetryPolicy:
+    """Bounded exponential backoff within one deadline, with model fallback.
+
+    Call Remaining() before every attempt and Failed(error) after a failed
+    one; Failed re-raises the error once retries or the deadline run out,
+    and a rate limit or oversized request moves on to the next model.
+    """
+
+    def __init__(self, Name, Deadline, Retries, Models):
+        self.Name = Name
+        self.Deadline = Deadline
+        self.Retries = Retries
+        self.Models = list(Models)
+        self.Attempt = 0
+        self.Ends = time.monotonic() + Deadline
+
+    @property
+    def Model(self):
+        return self.Models[0]
+
+    def Remaining(self):
+        Remaining = self.Ends - time.monotonic()
+        if Remaining <= 0:
+            raise TimeoutError(f"{self.Name} missed its {self.Deadline:.0f}s deadline")
+        return Remaining
+
+    def Failed(self, Error):
+        self.Attempt += 1
+        GiveUp = not IsRetryable(Error) or self.Attempt >= self.Retries
+        if (StatusOf(Error) in FallbackStatus or GiveUp) and len(self.Models) > 1:
+            logging.error(f"{self.Name} on {self.Model} failed ({Error}); falling back to {self.Models[1]}")
+            self.Models.pop(0)
+            return
+        if GiveUp:
+            raise Error
+        Delay = Backoff(self.Attempt - 1)
+        if time.monotonic() + Delay >= self.Ends:
+            raise Error
+        logging.error(f"{self.Name} attempt {self.Attempt} failed ({Error}); retrying in {Delay:.1f}s")
+        time.sleep(Delay)
+
+def ChatStream(Messages, Model=DefaultModel, Name="chat", Deadline=LLMTimeout, Retries=LLMRetries, Fallback=FallbackModel, **Options):
+    """Stream a Groq chat completion token by token.
+
+    Failures before the first token are retried with exponential backoff
+    within Deadline seconds, falling back to the Fallback model; once text
+    has been yielded a failure is raised, since retrying would repeat it.
+    """
+    Started = time.perf_counter()
+    Models = [Model] + ([Fallback] if Fallback and Fallback != Model else [])
+    Call = {"name": Name, "model": Model, "ttft": None, "retries": 0, "error": None,
+            "prompt_tokens": sum(CountTokens(m["content"]) for m in Messages), "completion_tokens": 0}
+    Parts = []
+    Policy = RetryPolicy(Name, Deadline, Retries, Models)
+    try:
+        while True:
+            Remaining = Policy.Remaining()
+            Call["model"], Call["retries"] = Policy.Model, Policy.Attempt
+            try:
+                Stream = GroqClient().chat.completions.create(
+                    model=Policy.Model, messages=Messages, stream=True, timeout=Remaining, **Options
+                )
+                for Chunk in Stream:
+                    Usage = getattr(getattr(Chunk, "x_groq", None), "usage", None)
+                    if Usage is not None:
+                        Call["prompt_tokens"] = Usage.prompt_tokens
+                        Call["completion_tokens"] = Usage.completion_tokens
+                    if Chunk.choices and Chunk.choices[0].delta.content:
+                        if Call["ttft"] is None:
+                            Call["ttft"] = time.perf_counter() - Started
+                        Parts.append(Chunk.choices[0].delta.content)
+                        yield Chunk.choices[0].delta.content
+                    Policy.Remaining()
+                return
+            except Exception as e:
+                if Parts:
+                    raise
+                Policy.Failed(e)
+    except Exception as e:
+        Call["error"] = str(e)
+        raise
+    finally:
+        Call["completion_tokens"] = Call["completion_tokens"] or CountTokens("".join(Parts))
+        Metrics.Record(latency=time.perf_counter() - Started, **Call)
+
+def Chat(Messages, **Options):
+    """Complete a chat and return the whole answer."""
+    return "".join(ChatStream(Messages, **Options))
+
+def CohereChatStream(Name="decision", Deadline=LLMTimeout, Retries=LLMRetries, **Options):
+    """Stream the text of a Cohere chat, with the same retries and metrics as ChatStream."""
+    Started = time.perf_counter()
+    Call = {"name": Name, "model": Options.get("model"), "ttft": None, "retries": 0, "error": None,
+            "prompt_tokens": CountTokens(Options.get("message", "")), "completion_tokens": 0}
+    Parts = []
+    Policy = RetryPolicy(Name, Deadline, Retries, [Options.get("model")])
+    try:
+        while True:
+            Remaining = Policy.Remaining()
+            Call["retries"] = Policy.Attempt
+            try:
+                for Event in CohereClient().chat_stream(request_options={"timeout_in_seconds": max(1, int(Remaining))}, **Options):
+                    if Event.event_type == "text-generation":
+                        if Call["ttft"] is None:
+                            Call["ttft"] = time.perf_counter() - Started
+                        Parts.append(Event.text)
+                        yield Event.text
+                return
+            except Exception as e:
+                if Parts:
+                    raise
+                Policy.Failed(e)
+    except Exception as e:
+        Call["error"] = str(e)
+        raise
+    finally:
+        Call["completion_tokens"] = CountTokens("".join(Parts))
+        Metrics.Record(latency=time.perf_counter() - Started, **Call)
+
+class FakeLLMServer:
+    """Local stand-in for the Groq and Cohere chat APIs, for tests and benchmarks.
+
+    Streams Reply(messages) word by word for Groq chats and Decide(message)
+    for Cohere decisions, TokenDelay seconds apart, after FirstTokenDelay;
+    the first FailFirst requests get a 503 to exercise retries. Point the
+    clients at it with LLMFakeServer=<Url> in .env.
+    """
+
+    def __init__(self, Reply=None, Decide=None, Port=0, TokenDelay=0.0, FirstTokenDelay=0.0, FailFirst=0):
+        self.Reply = Reply or (lambda Messages: f"You said: {Messages[-1]['content']}")
+        self.Decide = Decide or (lambda Message: f"general {Message}")
+        self.TokenDelay = TokenDelay
+        self.FirstTokenDelay = FirstTokenDelay
+        self.FailFirst = FailFirst
+        self.Requests = 0
+        self.Server = ThreadingHTTPServer(("127.0.0.1", Port), self._handler())
+        self.Url = f"http://127.0.0.1:{self.Server.server_address[1]}"
+
+    def Start(self):
+        threading.Thread(target=self.Server.serve_forever, daemon=True).start()
+        return self.Url
+
+    def Stop(self):
+        self.Server.shutdown()
+
+    def Words(self, Text):
+        time.sleep(self.FirstTokenDelay)
+        Words = Text.split(" ")
+        for Index, Word in enumerate(Words):
+            if Index:
+                time.sleep(self.TokenDelay)
+            yield Word if Index == len(Words) - 1 else Word + " "
+
+    def _handler(self):
+        Fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *Args):
+                pass
+
+            def Send(self, Status, ContentType):
+                self.send_response(Status)
+                self.send_header("Content-Type", ContentType)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+            def Write(self, Text):
+                Data = Text.encode("utf-8")
+                self.wfile.write(f"{len(Data):x}\r\n".encode() + Data + b"\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                Body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                Fake.Requests += 1
+                if Fake.Requests <= Fake.FailFirst:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if self.path.endswith("/chat/completions"):
+                    self.Groq(Body)
+                elif self.path.endswith("/chat"):
+                    self.Cohere(Body)
+                else:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+
+            def Groq(self, Body):
+                self.Send(200, "text/event-stream")
+                Base = {"id": "fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": Body.get("model")}
+                for Word in Fake.Words(Fake.Reply(Body.get("messages", []))):
+                    Chunk = dict(Base, choices=[{"index": 0, "delta": {"content": Word}, "finish_reason": None}])
+                    self.Write(f"data: {json.dumps(Chunk)}\n\n")
+                Chunk = dict(Base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+                self.Write(f"data: {json.dumps(Chunk)}\n\ndata: [DONE]\n\n")
+                self.Write("")
+
+            def Cohere(self, Body):
+                self.Send(200, "application/stream+json")
+                self.Write(json.dumps({"is_finished": False, "event_type": "stream-start", "generation_id": "fake"}) + "\n")
+                Text = ""
+                for Word in Fake.Words(Fake.Decide(Body.get("message", ""))):
+                    Text += Word
+                    self.Write(json.dumps({"is_finished": False, "event_type": "text-generation", "text": Word}) + "\n")
+                Response = {"text": Text, "generation_id": "fake", "finish_reason": "COMPLETE"}
+                self.Write(json.dumps({"is_finished": True, "event_type": "stream-end", "finish_reason": "COMPLETE", "response": Response}) + "\n")
+                self.Write("")
+
+        return Handler
+
+# Serve fake completions for the rest of the app: python -m Backend.LLMGateway [port]
+if __name__ == "__main__":
+    import sys
+
+    Server = FakeLLMServer(Port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765, TokenDelay=0.02)
+    print(f"Fake LLM server on {Server.Url}; set LLMFakeServer={Server.Url} in .env")
+    Server.Server.serve_forever()
@@ -1,16 +1,16 @@
-import cohere  # Import the Cohere library for AI services.
+import os  # Import os for the cache file path.
+import time  # Import time to measure classification latency.
 from rich import print  # type: ignore # Import the Rich library to enhance terminal outputs.
 from dotenv import dotenv_values  # type: ignore # Import dotenv to load environment variables from a .env file.
+from Backend.IntentClassifier import ClassifyLocally, RecordClassification, ClassifierStats, Normalize  # Import the local fast-path classifier.
+from Backend.PersistentCache import PersistentCache  # Import the LRU+TTL cache for decisions.
+from Backend.LLMGateway import CohereChatStream  # Import the shared, pooled Cohere client.
+from Backend.SemanticCache import SemanticCache  # Import the cache that matches reworded queries.
+from Backend.Tracing import Traced, Annotate  # Import span tracing for per-stage latency.
 
 # Load environment variables from the .env file.
 env_vars = dotenv_values('.env')
 
-# Retrieve API key.
-CohereAPIKey = env_vars.get("CohereAPIKey")
-
-# Create a Cohere client using the provided API key.
-co = cohere.Client(api_key=CohereAPIKey)
-
 # Define a list of recognized function keywords for task categorization.
 funcs = [
     "exit", "general", "realtime", "open", "close", "play",
@@ -18,6 +18,25 @@ funcs = [
     "youtube search", "reminder"
 ]
 
+# Cache of model decisions keyed on the normalized query, kept across restarts.
+DecisionCache = PersistentCache(os.path.join("Data", "DecisionCache.json"), MaxEntries=int(env_vars.get("DecisionCacheSize", 512)))
+
+# Time-to-live in seconds for cached decisions by task type. Realtime and
+# reminder decisions depend on when they were asked, so they expire quickly
+# or are never cached; everything else is reused for a week.
+DecisionTTL = {
+    "realtime": 600,
+    "reminder": 0,
+    "exit": 0,
+}
+DefaultDecisionTTL = 7 * 24 * 3600
+
+# Kinds of reworded queries ("what's the weather today" / "how is the weather today").
+# Only single general or realtime decisions are kept, since those carry the
+# query itself and can be rebuilt around the new wording.
+SimilarDecisions = SemanticCache(TTL=DefaultDecisionTTL)
+ReusableKinds = ("general", "realtime")
+
 # Initialize an empty list to store user messages.
 messages = []
 
@@ -59,13 +78,14 @@ chatHistory = [
     {"role": "Chatbot", "message": "general chat with me."}
 ]
 
-# Define the main function for decision-making on queries.
-def FirstLayerDMM(prompt: str = "test"):
+# Define the function that asks the Cohere model to categorize a query.
+def AskDecisionModel(prompt: str):
     # Add the user's query to the messages list.
     messages.append({"role": "user", "content": f"{prompt}"})
 
-    # Create a streaming chat session with the Cohere model.
-    stream = co.chat_stream(
+    # Create a streaming chat session with the Cohere model through the gateway.
+    stream = CohereChatStream(
+        Name="decision",
         model='command-r-plus',
         message=prompt,
         temperature=0.7,
@@ -78,21 +98,59 @@ def FirstLayerDMM(prompt: str = "test"):
     # Initialize an empty string to store the generated response.
     response = ""
 
-    # Iterate over events in the stream and capture text generation events.
-    for event in stream:
-        if event.event_type == "text-generation":
-            response += event.text
+    # Collect the generated text.
+    for text in stream:
+        response += text
 
     # Clean and split responses into individual tasks.
     response = response.replace("\n", "").split(",")
     response = [i.strip() for i in response]
 
     # Filter the tasks based on recognized function keywords.
-    filtered_response = [task for task in response if any(task.startswith(func) for func in funcs)]
+    return [task for task in response if any(task.startswith(func) for func in funcs)]
+
+# Define the function that picks the cache lifetime for a decision list.
+def DecisionCacheTTL(decision):
+    return min((DecisionTTL.get(func, DefaultDecisionTTL) for task in decision for func in funcs if task.startswith(func)), default=0)
 
-    # Recursively handle unresolved queries.
-    if "query" in filtered_response:
-        return FirstLayerDMM(prompt=prompt)
+# Define the main function for decision-making on queries.
+@Traced("decision")
+def FirstLayerDMM(prompt: str = "test", max_retries: int = 3):
+    start_time = time.perf_counter()
+
+    # Answer confidently routable queries locally without a network round trip.
+    filtered_response = ClassifyLocally(prompt)
+    if filtered_response is not None:
+        RecordClassification(True, time.perf_counter() - start_time)
+        Annotate(source="local")
+        return filtered_response
+
+    # Reuse the decision for a query the model has already categorized.
+    cache_key = Normalize(prompt)
+    filtered_response = DecisionCache.Get(cache_key)
+    if filtered_response is not None:
+        Annotate(source="cache")
+        return filtered_response
+
+    # A reworded query of a known kind is answered with the current wording.
+    kind = SimilarDecisions.Get(prompt)
+    if kind is not None:
+        Annotate(source="similar")
+        return [f"{kind} {prompt}"]
+
+    # Ask the model, retrying a bounded number of times on unresolved queries.
+    for _ in range(max_retries):
+        filtered_response = AskDecisionModel(prompt)
+        if "query" not in filtered_response:
+            break
+
+    RecordClassification(False, time.perf_counter() - start_time)
+    Annotate(source="model")
+    if filtered_response and "query" not in filtered_response:
+        DecisionCache.Put(cache_key, filtered_response, TTL=DecisionCacheTTL(filtered_response))
+        kind = filtered_response[0].split(" ", 1)[0]
+        if len(filtered_response) == 1 and kind in ReusableKinds:
+            SimilarDecisions.Put(prompt, kind, TTL=DecisionCacheTTL(filtered_response))
     return filtered_response
 
 # Entry point for the script.
@@ -100,3 +158,4 @@ if __name__ == "__main__":
     while True:
         user_input = input(">>> ")
         print(FirstLayerDMM(user_input))
+        print(ClassifierStats(), DecisionCache.Stats(), SimilarDecisions.Stats())
@@ -0,0 +1,108 @@
+import re  # For tokenization
+import math  # For BM25 idf
+from bs4 import BeautifulSoup  # For extracting the main text of a page
+from Backend.ContextWindow import CountTokens  # For fitting passages into the prompt budget
+
+# Words ignored when matching queries against passages and each other.
+StopWords = {
+    "a", "an", "the", "is", "are", "was", "were", "what", "whats", "who", "whos", "how", "hows",
+    "of", "in", "on", "for", "to", "me", "tell", "about", "please", "can", "you", "do", "does",
+    "and", "or", "it", "its", "this", "that", "with", "by", "at", "as", "be", "from",
+}
+
+# Page furniture that never holds the answer.
+BoilerplateTags = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe", "button"]
+TextTags = ["p", "li", "h1", "h2", "h3", "h4", "td", "blockquote", "pre"]
+MinBlockLength = 40  # Shorter blocks are usually menus, captions or buttons
+
+def Tokenize(Text):
+    return [w for w in re.findall(r"\w+", Text.lower()) if w not in StopWords]
+
+def ExtractMainText(Html):
+    """Main readable text of an HTML page, one block per line."""
+    Soup = BeautifulSoup(Html, "html.parser")
+    for Tag in Soup(BoilerplateTags):
+        Tag.decompose()
+    Root = Soup.find("article") or Soup.find("main") or Soup.find(attrs={"role": "main"}) or Soup.body or Soup
+
+    Blocks = []
+    for Tag in Root.find_all(TextTags):
+        if Tag.find(TextTags):
+            continue  # The nested block is collected on its own.
+        Text = " ".join(Tag.get_text(" ").split())
+        if len(Text) >= MinBlockLength:
+            Blocks.append(Text)
+    if not Blocks:
+        Blocks = [" ".join(Root.get_text(" ").split())]
+    return "\n".join(Blocks)
+
+def SplitPassages(Text, Words=80):
+    """Group consecutive blocks into passages of about Words words.
+
+    Blocks longer than Words are cut into Words-sized windows.
+    """
+    Passages = []
+    Current = []
+    for Block in Text.split("\n"):
+        BlockWords = Block.split()
+        while len(BlockWords) > Words:
+            Passages.append(" ".join(BlockWords[:Words]))
+            BlockWords = BlockWords[Words:]
+        if len(Current) + len(BlockWords) > Words and Current:
+            Passages.append(" ".join(Current))
+            Current = []
+        Current += BlockWords
+    if Current:
+        Passages.append(" ".join(Current))
+    return Passages
+
+class BM25:
+    """Okapi BM25 scoring of a fixed set of documents."""
+
+    def __init__(self, Documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.Documents = [Tokenize(d) for d in Documents]
+        self.AverageLength = sum(len(d) for d in self.Documents) / len(self.Documents) if self.Documents else 0
+        Frequencies = {}
+        for Document in self.Documents:
+            for Word in set(Document):
+                Frequencies[Word] = Frequencies.get(Word, 0) + 1
+        Count = len(self.Documents)
+        self.Idf = {w: math.log(1 + (Count - n + 0.5) / (n + 0.5)) for w, n in Frequencies.items()}
+
+    def Scores(self, Query):
+        Terms = set(Tokenize(Query))
+        Scores = []
+        for Document in self.Documents:
+            Counts = {}
+            for Word in Document:
+                if Word in Terms:
+                    Counts[Word] = Counts.get(Word, 0) + 1
+            Norm = self.k1 * (1 - self.b + self.b * len(Document) / (self.AverageLength or 1))
+            Scores.append(sum(self.Idf[w] * c * (self.k1 + 1) / (c + Norm) for w, c in Counts.items()))
+        return Scores
+
+def TopPassages(Query, Pages, Count=5, TokenBudget=1200):
+    """Best-matching passages across Pages [(url, text)] that fit in TokenBudget.
+
+    Returns [(url, passage)] in descending relevance; passages that share no
+    terms with the query are never included.
+    """
+    Candidates = [(Url, Passage) for Url, Text in Pages if Text for Passage in SplitPassages(Text)]
+    if not Candidates:
+        return []
+    Scores = BM25([p for _, p in Candidates]).Scores(Query)
+    Ranked = sorted(zip(Scores, range(len(Candidates))), reverse=True)
+
+    Chosen = []
+    Used = 0
+    for Score, Index in Ranked:
+        if Score <= 0 or len(Chosen) == Count:
+            break
+        Tokens = CountTokens(Candidates[Index][1])
+        if Used + Tokens > TokenBudget:
+            continue
+        Chosen.append(Candidates[Index])
+        Used += Tokens
+    return Chosen
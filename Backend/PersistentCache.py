@@ -0,0 +1,89 @@
+import os  # For path operations
+import json  # For saving entries to disk
+import time  # For expiry timestamps
+import threading  # Guards entries and counters
+from collections import OrderedDict  # Keeps entries in least-recently-used order
+
+class PersistentCache:
+    """Thread-safe LRU cache with a time-to-live per entry.
+
+    With a Path the entries are written to a JSON file on every change and
+    loaded back on startup, so they survive restarts; without one the cache
+    lives in memory only. Keys must be strings and values JSON-serializable
+    when a Path is given.
+    """
+
+    def __init__(self, Path=None, MaxEntries=512, TTL=3600):
+        self.Path = Path
+        self.MaxEntries = MaxEntries
+        self.TTL = TTL
+        self.Hits = 0
+        self.Misses = 0
+        self._entries = OrderedDict()  # Key -> [Value, ExpiresAt]
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        if Path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.Path, "r", encoding="utf-8") as f:
+                Entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        Now = time.time()
+        for Key, (Value, ExpiresAt) in Entries.items():
+            if ExpiresAt > Now:
+                self._entries[Key] = [Value, ExpiresAt]
+
+    def Save(self):
+        if not self.Path:
+            return
+        with self._save_lock:
+            with self._lock:
+                Snapshot = dict(self._entries)
+            os.makedirs(os.path.dirname(self.Path) or ".", exist_ok=True)
+            Temp = f"{self.Path}.tmp"
+            with open(Temp, "w", encoding="utf-8") as f:
+                json.dump(Snapshot, f)
+            os.replace(Temp, self.Path)  # Atomic, so a crash never leaves half a file.
+
+    def Get(self, Key, Default=None):
+        with self._lock:
+            Entry = self._entries.get(Key)
+            if Entry is None or Entry[1] <= time.time():
+                self._entries.pop(Key, None)
+                self.Misses += 1
+                return Default
+            self._entries.move_to_end(Key)
+            self.Hits += 1
+            return Entry[0]
+
+    def Put(self, Key, Value, TTL=None):
+        TTL = self.TTL if TTL is None else TTL
+        if TTL <= 0:
+            return
+        with self._lock:
+            self._entries[Key] = [Value, time.time() + TTL]
+            self._entries.move_to_end(Key)
+            while len(self._entries) > self.MaxEntries:
+                self._entries.popitem(last=False)
+        self.Save()
+
+    def Clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.Save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def Stats(self):
+        with self._lock:
+            Lookups = self.Hits + self.Misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.Hits,
+                "misses": self.Misses,
+                "hit_rate": self.Hits / Lookups if Lookups else 0.0,
+            }
@@ -1,12 +1,14 @@
-from googlesearch import search  # For performing Google searches
-from groq import Groq  # For Groq AI API integration
-from json import load, dump  # For reading and writing JSON files
+from Backend.LLMGateway import ChatStream  # Shared, pooled LLM client with retries
+from Backend.ChatLogStore import ChatLog  # Shared append-only chat log
+from Backend.ContextWindow import Context  # Token-budgeted prompt building
+from Backend.SearchPipeline import SearchPages, RunSearch, SearchResultTTL  # Concurrent, cached search
+from Backend.PassageRanker import TopPassages  # BM25 passage selection
+from Backend.SemanticCache import SemanticCache  # Reuses results for reworded searches
+from Backend.Tracing import Traced, Annotate  # Per-stage latency spans
 import datetime  # For real-time date and time information
 from dotenv import dotenv_values  # For reading environment variables
-import os  # For path operations
 import logging  # For error logging
 from queue import Queue  # For basic concurrency management
-import time  # To add delays between searches (in case of rate-limiting)
 
 # Configure logging
 logging.basicConfig(
@@ -40,8 +42,9 @@ except Exception as e:
     logging.error(f"Environment setup failed: {str(e)}")
     raise
 
-# Initialize Groq client
-client = Groq(api_key=GroqAPIKey)
+# How much of the fetched pages goes into the prompt
+SearchPassageCount = int(env_vars.get("SearchPassageCount", 5))
+SearchTokenBudget = int(env_vars.get("SearchTokenBudget", 1200))
 
 # System message with proper formatting
 System = (
@@ -52,45 +55,47 @@ System = (
     "*** Just answer the question from the provided data in a professional way. ***"
 )
 
-# Chat log management with proper error handling
-def load_or_create_chat_log():
-    chat_log_path = os.path.join("Data", "ChatLog.json")
-    try:
-        os.makedirs(os.path.dirname(chat_log_path), exist_ok=True)
-        try:
-            with open(chat_log_path, "r") as f:
-                return load(f)
-        except FileNotFoundError:
-            with open(chat_log_path, "w") as f:
-                dump([], f)
-            return []
-    except Exception as e:
-        logging.error(f"Chat log operation failed: {str(e)}")
-        return []
-
-messages = load_or_create_chat_log()
+# Search results reused when the same thing is asked again in other words
+SimilarSearches = SemanticCache(MaxEntries=256, TTL=SearchResultTTL)
 
 # Message queue for handling multiple queries
 message_queue = Queue()
 
+def FormatSearchResults(query, pages):
+    """Keep only the passages most relevant to the query, within the search token budget"""
+    if not pages:
+        return f"No results found for '{query}'"
+    passages = TopPassages(query, pages, SearchPassageCount, SearchTokenBudget)
+    Answer = f"Search results for '{query}':\n[start]\n"
+    for url, passage in passages:
+        Answer += f"Source: {url}\n{passage}\n\n"
+    if not passages:
+        # Nothing matched; the URLs still tell the model where answers live.
+        Answer += "".join(f"URL: {url}\n" for url, _ in pages)
+    Answer += "[end]"
+    return Answer
+
+@Traced("search")
 def GoogleSearch(query, max_retries=3):
-    """Perform Google search with error handling and retries"""
-    for attempt in range(max_retries):
-        try:
-            time.sleep(2)  # Delay to prevent hitting rate limits (2 seconds between requests)
-            results = list(search(query, num=5, stop=5, pause=2))
-            if not results:
-                return f"No results found for '{query}'"
-            Answer = f"Search results for '{query}':\n[start]\n"
-            for url in results:
-                Answer += f"URL: {url}\n"
-            Answer += "[end]"
-            return Answer
-        except Exception as e:
-            if attempt == max_retries - 1:
-                logging.error(f"Google search failed: {str(e)}")
-                return f"Search failed after {max_retries} attempts"
-            continue
+    """Search and fetch the result pages concurrently, with caching and rate-limited retries"""
+    Cached = SimilarSearches.Get(query)
+    Annotate(cached=Cached is not None)
+    if Cached is not None:
+        return Cached
+    try:
+        pages = RunSearch(SearchPages(query, Retries=max_retries))
+    except Exception as e:
+        logging.error(f"Google search failed: {str(e)}")
+        return f"Search failed after {max_retries} attempts"
+    return RememberSearch(query, pages)
+
+def RememberSearch(query, pages):
+    """Format search results, keeping them for reworded repeats of the query"""
+    Results = FormatSearchResults(query, pages)
+    Annotate(pages=len(pages), page_bytes=sum(len(text) for _, text in pages))
+    if pages:
+        SimilarSearches.Put(query, Results)
+    return Results
 
 def Information():
     """Get formatted real-time information"""
@@ -104,64 +109,61 @@ def Information():
         f"Time: {current_date_time.strftime('%H:%M:%S')}\n"
     )
 
-def clean_message_history(max_history=10):
-    """Clean up message history to a manageable size"""
-    global messages
-    messages = messages[-max_history:] if len(messages) > max_history else messages
+@Traced("realtime")
+def RealtimeSearchEngineStream(prompt):
+    """Real-time search and response generation, yielding the answer token by token"""
 
-def RealtimeSearchEngine(prompt, max_history=10):
-    """Enhanced real-time search and response generation"""
-    global messages
-    
     if not prompt.strip():
-        return "Please provide a valid query"
+        yield "Please provide a valid query"
+        return
 
+    Answer = ""
     try:
-        # Manage message history
-        clean_message_history(max_history)
-        messages.append({"role": "user", "content": prompt})
+        user_message = {"role": "user", "content": prompt}
 
-        # Prepare system context
-        current_context = [
+        # Prepare system context and fit the message history into the token budget
+        current_context = Context.Build([
             {"role": "system", "content": System},
             {"role": "system", "content": GoogleSearch(prompt)},
             {"role": "system", "content": Information()}
-        ] + messages
+        ], user_message, MaxTokens=1024)
 
-        # Generate response with error handling
+        # Generate and stream the response with error handling; the gateway retries and falls back
         try:
-            completion = client.chat.completions.create(
-                model="llama3-70b-8192",
-                messages=current_context,
+            for Token in ChatStream(
+                current_context,
+                Name="realtime",
                 temperature=0.7,
-                max_tokens=2048,
+                max_tokens=1024,
                 top_p=1,
-                stream=True,
                 stop=None
-            )
+            ):
+                Token = Token.replace("</s>", "")
+                # Drop leading whitespace so the streamed answer matches the stripped one
+                if not Answer:
+                    Token = Token.lstrip()
+                Answer += Token
+                yield Token
         except Exception as e:
             logging.error(f"API call failed: {str(e)}")
-            return "Sorry, I encountered an error while processing your request"
-
-        # Process streaming response
-        Answer = ""
-        for chunk in completion:
-            if chunk.choices[0].delta.content:
-                Answer += chunk.choices[0].delta.content
+            if not Answer:
+                yield "Sorry, I encountered an error while processing your request"
+            return
 
         # Clean and save response
-        Answer = Answer.strip().replace("</s>", "")
-        messages.append({"role": "assistant", "content": Answer})
+        Answer = Answer.strip()
 
         # Save chat log
-        with open(os.path.join("Data", "ChatLog.json"), "w") as f:
-            dump(messages, f, indent=4)
-
-        return Answer.strip()
+        ChatLog.Extend([user_message, {"role": "assistant", "content": Answer}])
 
     except Exception as e:
         logging.error(f"RealTimeSearchEngine error: {str(e)}")
-        return "An error occurred while processing your request"
+        if not Answer:
+            yield "An error occurred while processing your request"
+
+def RealtimeSearchEngine(prompt):
+    """Enhanced real-time search and response generation"""
+    return "".join(RealtimeSearchEngineStream(prompt)).strip()
 
 if __name__ == "__main__":
     print(f"Chatbot {Assistantname} initialized. Type 'quit' to exit.")
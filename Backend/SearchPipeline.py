@@ -0,0 +1,154 @@
+import re  # For query normalization
+import time  # For the token bucket clock
+import asyncio  # For concurrent page fetches
+import logging  # For error logging
+import threading  # Runs the pipeline's event loop in the background
+from urllib.parse import urlparse, parse_qs  # For decoding result links
+import httpx  # Pooled async HTTP client
+from bs4 import BeautifulSoup  # For parsing result and content pages
+from dotenv import dotenv_values  # For reading environment variables
+from Backend.PersistentCache import PersistentCache  # TTL caches for results and page text
+from Backend.PassageRanker import ExtractMainText, StopWords  # Main-text extraction
+
+# Load environment variables
+env_vars = dotenv_values(".env")
+
+SearchEndpoint = env_vars.get("SearchEndpoint", "https://www.google.com/search")
+SearchResultCount = int(env_vars.get("SearchResultCount", 5))
+SearchTimeout = float(env_vars.get("SearchTimeout", 5))  # Seconds per request
+SearchResultTTL = 15 * 60  # Results for a query stay fresh for 15 minutes
+PageTextTTL = 60 * 60  # Extracted page text is reused for an hour
+MaxPageBytes = 2 * 1024 * 1024  # Skip pages larger than this
+
+UserAgent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36"
+
+QueryCache = PersistentCache(MaxEntries=256, TTL=SearchResultTTL)
+PageCache = PersistentCache(MaxEntries=512, TTL=PageTextTTL)
+
+class TokenBucket:
+    """Allows Capacity requests at once, refilled at Rate requests per second."""
+
+    def __init__(self, Rate, Capacity):
+        self.Rate = Rate
+        self.Capacity = Capacity
+        self.Tokens = Capacity
+        self.Updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def Acquire(self):
+        async with self._lock:
+            while True:
+                Now = time.monotonic()
+                self.Tokens = min(self.Capacity, self.Tokens + (Now - self.Updated) * self.Rate)
+                self.Updated = Now
+                if self.Tokens >= 1:
+                    self.Tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.Tokens) / self.Rate)
+
+# Pooled client and rate limiter, created on the pipeline loop.
+SearchBucket = None
+Client = None
+Loop = None
+LoopLock = threading.Lock()
+
+def NormalizeQuery(Query):
+    # Case, spacing and stop words are ignored, so "what is the weather today" and
+    # "weather today" share one cache entry. Word order is kept: "dollar to rupee"
+    # and "rupee to dollar" are different searches.
+    Words = re.findall(r"\w+", Query.lower())
+    return " ".join(w for w in Words if w not in StopWords) or " ".join(Words)
+
+def GetLoop():
+    """Start the pipeline's long-lived event loop in a daemon thread, once."""
+    global Loop
+    with LoopLock:
+        if Loop is None:
+            Loop = asyncio.new_event_loop()
+            threading.Thread(target=Loop.run_forever, daemon=True).start()
+    return Loop
+
+def RunSearch(Coroutine):
+    """Run a pipeline coroutine from synchronous code and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(Coroutine, GetLoop()).result()
+
+async def RunSearchAsync(Coroutine):
+    """Await a pipeline coroutine from another event loop."""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(Coroutine, GetLoop()))
+
+def GetClient():
+    # Created on the pipeline loop so connections are pooled and kept alive across searches.
+    global Client, SearchBucket
+    if Client is None:
+        Client = httpx.AsyncClient(
+            headers={"User-Agent": UserAgent},
+            timeout=SearchTimeout,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            follow_redirects=True,
+        )
+        SearchBucket = TokenBucket(Rate=0.5, Capacity=3)  # A burst of 3, then one every 2 seconds
+    return Client
+
+def ParseResultLinks(Html):
+    """Extract outbound result URLs from a search results page."""
+    Urls = []
+    for Link in BeautifulSoup(Html, "html.parser").find_all("a", href=True):
+        Href = Link["href"]
+        if Href.startswith("/url?"):
+            Href = parse_qs(urlparse(Href).query).get("q", [""])[0]
+        Host = urlparse(Href).netloc
+        if Href.startswith("http") and "google." not in Host and Href not in Urls:
+            Urls.append(Href)
+    return Urls
+
+async def SearchUrls(Query, Count=SearchResultCount, Retries=3):
+    """Top result URLs for Query, served from the query cache when possible.
+
+    At least SearchResultCount results are fetched and cached whatever Count
+    is, so a one-link lookup doesn't leave later searches short of results.
+    """
+    Key = NormalizeQuery(Query)
+    Cached = QueryCache.Get(Key)
+    if Cached is not None:
+        return Cached[:Count]
+
+    Client = GetClient()
+    Fetched = max(Count, SearchResultCount)
+    for Attempt in range(Retries):
+        await SearchBucket.Acquire()
+        try:
+            Response = await Client.get(SearchEndpoint, params={"q": Query, "num": Fetched + 2, "hl": "en"})
+            Response.raise_for_status()
+        except httpx.HTTPError as e:
+            if Attempt == Retries - 1:
+                raise
+            logging.error(f"Search attempt {Attempt + 1} failed: {str(e)}")
+            continue
+        Urls = ParseResultLinks(Response.text)[:Fetched]
+        if Urls:
+            QueryCache.Put(Key, Urls)
+        return Urls[:Count]
+    return []
+
+async def FetchPageText(Url):
+    """Main text of a result page, or "" if it can't be fetched in time."""
+    Cached = PageCache.Get(Url)
+    if Cached is not None:
+        return Cached
+    try:
+        Response = await GetClient().get(Url)
+        Response.raise_for_status()
+    except httpx.HTTPError as e:
+        logging.error(f"Fetching {Url} failed: {str(e)}")
+        return ""
+    if "html" not in Response.headers.get("content-type", "") or len(Response.content) > MaxPageBytes:
+        return ""
+    Text = await asyncio.to_thread(ExtractMainText, Response.text)
+    PageCache.Put(Url, Text)
+    return Text
+
+async def SearchPages(Query, Count=SearchResultCount, Retries=3):
+    """Search, then fetch every result page concurrently. Returns [(url, text)]."""
+    Urls = await SearchUrls(Query, Count, Retries)
+    Texts = await asyncio.gather(*(FetchPageText(Url) for Url in Urls))
+    return list(zip(Urls, Texts))
@@ -0,0 +1,138 @@
+import re  # For tokenization
+import time  # For expiry timestamps
+import zlib  # Stable feature hashing across runs
+import threading  # Guards the index
+import numpy as np  # Vector index and similarity search
+from dotenv import dotenv_values  # For reading environment variables
+
+# Load environment variables
+env_vars = dotenv_values(".env")
+
+# Cosine similarity a stored query needs to count as the same question.
+SemanticCacheThreshold = float(env_vars.get("SemanticCacheThreshold", 0.85))
+SemanticCacheSize = int(env_vars.get("SemanticCacheSize", 1024))
+
+# Filler that never changes what a question asks. Unlike PassageRanker's list this keeps
+# auxiliaries and negation, so "who was ..." and "who is not ..." differ from "who is ...".
+StopWords = {
+    "a", "an", "the", "of", "to", "in", "on", "at", "by", "for", "with", "from", "about",
+    "and", "or", "me", "tell", "please", "can", "could", "you",
+}
+
+# Contractions spelled out, so "what's" and "what is" give the same features.
+Contractions = [
+    (re.compile(r"\bcan't\b"), "can not"),
+    (re.compile(r"\bwon't\b"), "will not"),
+    (re.compile(r"n't\b"), " not"),
+    (re.compile(r"\b(what|who|where|when|how|it|that|there)'s\b"), r"\1 is"),
+    (re.compile(r"'re\b"), " are"),
+    (re.compile(r"'ll\b"), " will"),
+]
+
+def Features(Text):
+    """Words and word pairs of Text, without stop words."""
+    Text = Text.lower().replace("\u2019", "'")
+    for Pattern, Expansion in Contractions:
+        Text = Pattern.sub(Expansion, Text)
+    Words = [w for w in re.findall(r"\w+", Text.replace("'", "")) if w not in StopWords]
+    return Words + [f"{a} {b}" for a, b in zip(Words, Words[1:])]
+
+class SemanticCache:
+    """Cache keyed on what a query means rather than its exact words.
+
+    Queries are embedded with a hashed TF-IDF vectorizer: words and word
+    pairs are hashed into Dim buckets, term frequencies are stored in a
+    fixed MaxEntries x Dim matrix, and IDF weights come from the document
+    frequencies of the stored queries. A lookup scores every row at once
+    and returns the stored value of the closest query if its cosine
+    similarity reaches Threshold. Memory is fixed at creation; when full,
+    expired then least recently used rows are replaced.
+    """
+
+    def __init__(self, MaxEntries=SemanticCacheSize, Threshold=SemanticCacheThreshold, TTL=3600, Dim=1024):
+        self.MaxEntries = MaxEntries
+        self.Threshold = Threshold
+        self.TTL = TTL
+        self.Dim = Dim
+        self.Matrix = np.zeros((MaxEntries, Dim), dtype=np.float32)
+        self.DocFreq = np.zeros(Dim, dtype=np.float32)
+        self.Expires = np.zeros(MaxEntries)  # 0 marks an empty row
+        self.LastUsed = np.zeros(MaxEntries)
+        self.Values = [None] * MaxEntries
+        self.Hits = 0
+        self.Misses = 0
+        self._lock = threading.Lock()
+
+    def Vector(self, Text):
+        Vector = np.zeros(self.Dim, dtype=np.float32)
+        for Feature in Features(Text):
+            Vector[zlib.crc32(Feature.encode("utf-8")) % self.Dim] += 1
+        return np.log1p(Vector)  # Sublinear term frequency
+
+    def _weighted(self, Rows):
+        Live = max(1, int(np.count_nonzero(self.Expires)))
+        Idf = np.log((1 + Live) / (1 + self.DocFreq)) + 1
+        Weighted = Rows * Idf
+        Norms = np.linalg.norm(Weighted, axis=-1, keepdims=True)
+        return Weighted / np.where(Norms == 0, 1, Norms)
+
+    def _clear_row(self, Row):
+        self.DocFreq -= self.Matrix[Row] > 0
+        self.Matrix[Row] = 0
+        self.Expires[Row] = 0
+        self.Values[Row] = None
+
+    def _expire(self):
+        for Row in np.flatnonzero((self.Expires > 0) & (self.Expires <= time.time())):
+            self._clear_row(Row)
+
+    def TopK(self, Query, k=1):
+        """[(similarity, value)] of the k stored queries closest to Query, best first."""
+        Vector = self.Vector(Query)
+        with self._lock:
+            self._expire()
+            Live = np.flatnonzero(self.Expires)
+            if not Live.size or not Vector.any():
+                return []
+            Scores = self._weighted(self.Matrix[Live]) @ self._weighted(Vector)
+            k = min(k, Live.size)
+            Best = np.argpartition(-Scores, k - 1)[:k]
+            Best = Best[np.argsort(-Scores[Best])]
+            self.LastUsed[Live[Best[0]]] = time.monotonic()
+            return [(float(Scores[i]), self.Values[Live[i]]) for i in Best]
+
+    def Get(self, Query, Default=None):
+        Best = self.TopK(Query, 1)
+        if Best and Best[0][0] >= self.Threshold:
+            self.Hits += 1
+            return Best[0][1]
+        self.Misses += 1
+        return Default
+
+    def Put(self, Query, Value, TTL=None):
+        TTL = self.TTL if TTL is None else TTL
+        Vector = self.Vector(Query)
+        if TTL <= 0 or not Vector.any():
+            return
+        with self._lock:
+            self._expire()
+            Empty = np.flatnonzero(self.Expires == 0)
+            Row = Empty[0] if Empty.size else int(np.argmin(self.LastUsed))
+            self._clear_row(Row)
+            self.Matrix[Row] = Vector
+            self.DocFreq += Vector > 0
+            self.Expires[Row] = time.time() + TTL
+            self.LastUsed[Row] = time.monotonic()
+            self.Values[Row] = Value
+
+    def __len__(self):
+        return int(np.count_nonzero(self.Expires))
+
+    def Stats(self):
+        Lookups = self.Hits + self.Misses
+        return {
+            "entries": len(self),
+            "hits": self.Hits,
+            "misses": self.Misses,
+            "hit_rate": self.Hits / Lookups if Lookups else 0.0,
+        }
@@ -0,0 +1,354 @@
+import json  # For parsing recognizer results
+import time  # For latency measurements and real-time WAV playback
+import wave  # For reading recorded WAV fixtures
+import logging  # For reporting a monitor that cannot open the microphone
+import threading  # Guards the shared backend instance
+from collections import deque  # Ring buffer of audio heard just before a barge-in
+from array import array  # For computing frame energy without numpy
+from dotenv import dotenv_values  # For reading environment variables
+from Backend.SpeechToText import QueryModifier, UniversalTranslator, SetAssistantStatus, InputLanguage
+from Backend.Tracing import Traced, Annotate  # Per-stage latency spans
+
+# Optional offline engine; only needed when SpeechBackend=offline.
+try:
+    import vosk  # type: ignore
+except ImportError:
+    vosk = None
+
+# Load environment variables from the .env file.
+env_vars = dotenv_values(".env")
+
+# Which engine turns speech into text: "selenium" (Chrome Web Speech) or "offline" (Vosk).
+SpeechBackendName = env_vars.get("SpeechBackend", "selenium").lower()
+VoskModelPath = env_vars.get("VoskModelPath", "Data/vosk-model")
+SpeechWavInput = env_vars.get("SpeechWavInput")  # Read utterances from a WAV file instead of the mic.
+# Stop speaking as soon as the user starts talking over an answer. Opt-in: the monitor is a plain
+# energy VAD, so without a headset or echo cancellation the assistant's own voice trips it.
+BargeInEnabled = env_vars.get("BargeIn", "False").lower() == "true"
+# The speakers are loud while an answer plays, so barge-in needs louder and longer speech than normal listening.
+BargeInRatio = float(env_vars.get("BargeInRatio", 6.0))
+BargeInMs = int(env_vars.get("BargeInMs", 240))
+
+SampleRate = 16000
+FrameMs = 30
+
+def FrameEnergy(Frame):
+    """Root-mean-square level of a 16-bit mono PCM frame."""
+    Samples = array("h", Frame)
+    if not Samples:
+        return 0.0
+    return (sum(s * s for s in Samples) / len(Samples)) ** 0.5
+
+class EnergyVAD:
+    """Energy-based voice activity detector with an adaptive noise floor.
+
+    Feed fixed-size frames to Process(); it reports "start" once StartFrames
+    consecutive frames are louder than the noise floor by Ratio, and "end"
+    after HangoverMs of quiet following speech.
+    """
+
+    def __init__(self, FrameMs=FrameMs, Ratio=3.0, MinEnergy=300.0, StartFrames=3, HangoverMs=700):
+        self.Ratio = Ratio
+        self.MinEnergy = MinEnergy
+        self.StartFrames = StartFrames
+        self.HangoverFrames = max(1, HangoverMs // FrameMs)
+        self.NoiseFloor = MinEnergy / Ratio
+        self.Reset()
+
+    def Reset(self):
+        self.InSpeech = False
+        self._loud = 0
+        self._quiet = 0
+
+    def IsSpeech(self, Frame):
+        Energy = FrameEnergy(Frame)
+        Loud = Energy > max(self.MinEnergy, self.NoiseFloor * self.Ratio)
+        if not Loud:
+            # Track background noise only while nobody is talking.
+            self.NoiseFloor = 0.95 * self.NoiseFloor + 0.05 * Energy
+        return Loud
+
+    def Process(self, Frame):
+        """Return "start", "end" or None for this frame."""
+        Loud = self.IsSpeech(Frame)
+        if not self.InSpeech:
+            self._loud = self._loud + 1 if Loud else 0
+            if self._loud >= self.StartFrames:
+                self.InSpeech, self._quiet = True, 0
+                return "start"
+            return None
+        self._quiet = 0 if Loud else self._quiet + 1
+        if self._quiet >= self.HangoverFrames:
+            self.Reset()
+            return "end"
+        return None
+
+def WavFrames(Path, FrameMs=FrameMs, Realtime=False):
+    """Yield PCM frames from a 16 kHz, 16-bit mono WAV file.
+
+    With Realtime the frames are paced like a live microphone, otherwise
+    they are returned as fast as possible for deterministic benchmarks.
+    """
+    with wave.open(Path, "rb") as f:
+        if f.getnchannels() != 1 or f.getsampwidth() != 2 or f.getframerate() != SampleRate:
+            raise ValueError(f"{Path} must be 16 kHz, 16-bit mono PCM")
+        Samples = SampleRate * FrameMs // 1000
+        while True:
+            Frame = f.readframes(Samples)
+            if len(Frame) < Samples * 2:
+                return
+            if Realtime:
+                time.sleep(FrameMs / 1000)
+            yield Frame
+
+def MicrophoneFrames(FrameMs=FrameMs):
+    """Yield PCM frames from the default microphone until the generator is closed."""
+    import sounddevice  # type: ignore # Only needed for live offline capture.
+
+    Samples = SampleRate * FrameMs // 1000
+    with sounddevice.RawInputStream(samplerate=SampleRate, blocksize=Samples, channels=1, dtype="int16") as Stream:
+        while True:
+            Frame, _ = Stream.read(Samples)
+            yield bytes(Frame)
+
+class SpeechBackend:
+    """Interface every speech-to-text engine implements.
+
+    Stream() yields (Text, IsFinal) hypotheses for one utterance and ends
+    with the final one; Listen() turns that into the formatted query the
+    rest of the assistant expects.
+    """
+
+    def Start(self):
+        """Warm the engine up in the background; optional."""
+
+    def Frames(self):
+        """Audio frames the engine hears; used by the barge-in monitor."""
+        return MicrophoneFrames()
+
+    def Stream(self, timeout=60, **Options):
+        raise NotImplementedError
+
+    def Listen(self, timeout=60, OnPartial=None, **Options):
+        Text = ""
+        for Text, IsFinal in self.Stream(timeout, **Options):
+            if not IsFinal and OnPartial is not None:
+                OnPartial(Text)
+        if not Text:
+            return ""
+        if 'en' in InputLanguage.lower():
+            return QueryModifier(Text)
+        SetAssistantStatus("Translating .....")
+        return QueryModifier(UniversalTranslator(Text))
+
+class SeleniumSpeechBackend(SpeechBackend):
+    """Chrome Web Speech recognition through the warm session in SpeechToText."""
+
+    def Start(self):
+        from Backend import SpeechToText
+        SpeechToText.StartRecognitionSession()
+
+    def Stream(self, timeout=60, **Options):
+        """Yield the session's final transcript; the Web Speech page reports no partials.
+
+        Chrome captures its own audio, so barge-in preroll can't be handed over.
+        """
+        from Backend import SpeechToText
+        yield SpeechToText.RecognizeTranscript(timeout), True
+
+class OfflineSpeechBackend(SpeechBackend):
+    """Local Vosk recognition over microphone or WAV frames, ended by an EnergyVAD."""
+
+    def __init__(self, ModelPath=VoskModelPath, WavPath=SpeechWavInput):
+        self.ModelPath = ModelPath
+        self.WavPath = WavPath
+        self.Model = None
+        self._frames = None
+        self._lock = threading.Lock()
+
+    def Start(self):
+        with self._lock:
+            if self.Model is None:
+                if vosk is None:
+                    raise RuntimeError("SpeechBackend=offline needs the 'vosk' package")
+                vosk.SetLogLevel(-1)
+                self.Model = vosk.Model(self.ModelPath)
+
+    def Frames(self):
+        # A WAV fixture is read across utterances so one file can hold several of them;
+        # the microphone is reopened per utterance so stale audio is never recognized.
+        if not self.WavPath:
+            return MicrophoneFrames()
+        if self._frames is None:
+            self._frames = WavFrames(self.WavPath)
+        return self._frames
+
+    def Stream(self, timeout=60, Preroll=()):
+        """Yield partial hypotheses, then the final text once the VAD hears the end of speech.
+
+        Preroll frames (e.g. captured by a barge-in monitor) are recognized first.
+        """
+        self.Start()
+        Recognizer = vosk.KaldiRecognizer(self.Model, SampleRate)
+        Vad = EnergyVAD()
+        Heard = []
+        Partial = ""
+        Deadline = time.time() + timeout
+
+        def Frames():
+            yield from Preroll
+            yield from self.Frames()
+
+        for Frame in Frames():
+            Event = Vad.Process(Frame)
+            if Recognizer.AcceptWaveform(Frame):
+                Segment = json.loads(Recognizer.Result()).get("text", "")
+                if Segment:
+                    Heard.append(Segment)
+            else:
+                Text = json.loads(Recognizer.PartialResult()).get("partial", "")
+                if Text and Text != Partial:
+                    Partial = Text
+                    yield " ".join(Heard + [Text]), False
+            if Event == "end" or time.time() > Deadline:
+                break
+
+        if hasattr(Preroll, "close"):
+            Preroll.close()  # Releases a microphone handed over by the barge-in monitor.
+        Segment = json.loads(Recognizer.FinalResult()).get("text", "")
+        if Segment:
+            Heard.append(Segment)
+        yield " ".join(Heard), True
+
+class BargeInMonitor:
+    """Watches the microphone while an answer plays and stops it when the user speaks.
+
+    Call Start() when playback begins and pass the instance to the TTS
+    functions as their func callback: polls return False once speech is
+    heard, and func(False) at the end of playback stops it. With KeepAudio the
+    frames heard around the barge-in are kept for TakePreroll(), so the
+    recognizer gets the start of the utterance instead of missing it.
+    """
+
+    def __init__(self, Enabled=BargeInEnabled, KeepAudio=False, PrerollMs=600):
+        self.Enabled = Enabled
+        self.KeepAudio = KeepAudio
+        self.PrerollFrames = max(1, PrerollMs // FrameMs)
+        self.Triggered = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._preroll = ()
+        self._lock = threading.Lock()
+
+    def __call__(self, r=None):
+        if r is False:
+            self.Stop()
+            return False
+        return not self.Triggered.is_set()
+
+    def Start(self):
+        with self._lock:
+            if not self.Enabled or self._thread is not None:
+                return
+            self.Triggered.clear()
+            # A fresh event per thread, so a quick restart can't clear the stop meant for the previous one.
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,), daemon=True)
+            self._thread.start()
+
+    def Stop(self):
+        with self._lock:
+            Thread, self._thread = self._thread, None
+            self._stop.set()
+        # The thread exits after its current frame; wait so it releases the microphone
+        # (or the shared WAV fixture) before the next monitor opens it.
+        if Thread is not None and Thread is not threading.current_thread():
+            Thread.join(timeout=1)
+
+    def _run(self, Stop):
+        try:
+            Frames = GetSpeechBackend().Frames()
+        except Exception as e:
+            logging.error(f"Barge-in monitor disabled: {e}")
+            self.Enabled = False
+            return
+        # A WAV fixture is shared with the recognizer, which simply reads on from where the monitor stopped.
+        Shared = Frames is getattr(GetSpeechBackend(), "_frames", None)
+        Vad = EnergyVAD(Ratio=BargeInRatio, StartFrames=max(1, BargeInMs // FrameMs))
+        Recent = deque(maxlen=self.PrerollFrames)
+        Handed = False
+        try:
+            for Frame in Frames:
+                if Stop.is_set():
+                    break
+                Recent.append(Frame)
+                if Vad.Process(Frame) == "start":
+                    if self.KeepAudio:
+                        self._preroll = list(Recent) if Shared else self._handoff(list(Recent), Frames)
+                        Handed = True
+                    self.Triggered.set()
+                    break
+        except Exception as e:
+            # Frame sources are generators, so e.g. a missing sounddevice only fails on the first frame.
+            logging.error(f"Barge-in monitor disabled: {e}")
+            self.Enabled = False
+        finally:
+            if not Handed and not Shared:
+                Frames.close()
+
+    @staticmethod
+    def _handoff(Buffered, Live):
+        # Closing this generator also closes the microphone stream it continues.
+        yield from Buffered
+        yield from Live
+
+    def TakePreroll(self):
+        """Audio of the utterance that interrupted playback, or () if there was none."""
+        Preroll, self._preroll = self._preroll, ()
+        return Preroll
+
+Backends = {
+    "selenium": SeleniumSpeechBackend,
+    "offline": OfflineSpeechBackend,
+}
+ActiveBackend = None
+BackendLock = threading.Lock()
+
+def GetSpeechBackend():
+    """Return the configured backend, created once per process."""
+    global ActiveBackend
+    with BackendLock:
+        if ActiveBackend is None:
+            ActiveBackend = Backends[SpeechBackendName]()
+        return ActiveBackend
+
+def StartRecognitionSession():
+    threading.Thread(target=GetSpeechBackend().Start, daemon=True).start()
+
+@Traced("stt")
+def SpeechRecognition(timeout=60, OnPartial=None, **Options):
+    Annotate(backend=SpeechBackendName)
+    return GetSpeechBackend().Listen(timeout, OnPartial, **Options)
+
+# Only the offline engine reads raw frames, so only it can continue from the monitor's audio.
+BargeIn = BargeInMonitor(KeepAudio=SpeechBackendName == "offline")
+
+# Measure recognition latency on a recorded WAV fixture.
+if __name__ == "__main__":
+    import sys
+
+    Backend = OfflineSpeechBackend(WavPath=sys.argv[1])
+    Started = time.perf_counter()
+    Backend.Start()
+    print(f"Model loaded in {time.perf_counter() - Started:.2f}s")
+    while True:
+        Started = time.perf_counter()
+        First = None
+        for Text, IsFinal in Backend.Stream():
+            if First is None:
+                First = time.perf_counter() - Started
+            if IsFinal:
+                break
+        if not Text:
+            break
+        print(f"{Text!r}: first partial {First or 0:.3f}s, final {time.perf_counter() - Started:.3f}s")
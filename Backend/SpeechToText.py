@@ -2,12 +2,8 @@ import subprocess
 import threading
 import json
 import os
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import dotenv_values
+from Backend.StateBus import Bus
 import mtranslate as mt
 import time
 import asyncio
@@ -19,6 +15,9 @@ env_vars = dotenv_values(".env")
 InputLanguage = env_vars.get("InputLanguage", "en")  # Default to 'en' if not set.
 
 # Define the HTML code for the speech recognition interface.
+# The page stays loaded for the whole session: final transcripts are queued in
+# pendingResults and handed to Python through waitForResult, which the driver
+# calls with execute_async_script so a result is pushed back as soon as it exists.
 HtmlCode = '''<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -31,26 +30,63 @@ HtmlCode = '''<!DOCTYPE html>
     <script>
         const output = document.getElementById('output');
         let recognition;
+        let listening = false;
+        let pendingResults = [];
+        let waiter = null;
+
+        function deliver() {
+            if (waiter && pendingResults.length) {
+                const callback = waiter;
+                waiter = null;
+                callback(pendingResults.splice(0));
+            }
+        }
 
         function startRecognition() {
-            recognition = window.webkitSpeechRecognition ? new webkitSpeechRecognition() : new SpeechRecognition();
-            recognition.lang = 'en';
-            recognition.continuous = true;
+            pendingResults = [];
+            output.textContent = '';
+            listening = true;
+            if (!recognition) {
+                recognition = window.webkitSpeechRecognition ? new webkitSpeechRecognition() : new SpeechRecognition();
+                recognition.lang = 'en';
+                recognition.continuous = true;
 
-            recognition.onresult = function(event) {
-                const transcript = event.results[event.results.length - 1][0].transcript;
-                output.textContent += transcript;
-            };
+                recognition.onresult = function(event) {
+                    const transcript = event.results[event.results.length - 1][0].transcript;
+                    output.textContent += transcript;
+                    pendingResults.push(transcript);
+                    deliver();
+                };
 
-            recognition.onend = function() {
+                recognition.onend = function() {
+                    if (listening) {
+                        recognition.start();
+                    }
+                };
+            }
+            try {
                 recognition.start();
-            };
-
-            recognition.start();
+            } catch (e) {
+                // Already running.
+            }
         }
 
         function stopRecognition() {
-            recognition.stop();
+            listening = false;
+            if (recognition) {
+                recognition.stop();
+            }
+        }
+
+        function waitForResult(timeoutMs, callback) {
+            waiter = callback;
+            deliver();
+            setTimeout(function() {
+                if (waiter === callback) {
+                    waiter = null;
+                    callback([]);
+                }
+            }, timeoutMs);
         }
     </script>
 </body>
@@ -60,34 +96,79 @@ HtmlCode = '''<!DOCTYPE html>
 # Replace the language setting in the HTML code with the input language from the environment variables.
 HtmlCode = HtmlCode.replace("recognition.lang = 'en';", f"recognition.lang = '{InputLanguage}';")
 
-# Write the modified HTML code to a file.
-with open("DataVoice.html", "w", encoding='utf-8') as f:
-    f.write(HtmlCode)
-
 # Get the current working directory.
 current_dir = os.getcwd()
 # Generate the file path for the HTML file.
 Link = f"file:///{current_dir}/DataVoice.html"
 
-# Set Chrome options for the WebDriver.
-chrome_options = Options()
+# User agent for the Chrome session.
 user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/89.0.142.86 Safari/537.36"
-chrome_options.add_argument(f"user-agent={user_agent}")
-chrome_options.add_argument("--use-fake-ui-for-media-stream")
-chrome_options.add_argument("--use-fake-device-for-media-stream")
-# For debugging, comment out headless so the browser UI shows
-# chrome_options.add_argument("--headless")
 
-# Initialize the Chrome WebDriver using the ChromeDriverManager.
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
+# Longest single wait inside the page before Python checks the overall timeout again.
+ResultWaitSeconds = 10
+
+# The recognition session is started lazily, in the background, and reused for every utterance.
+driver = None
+DriverReady = threading.Event()
+SessionLock = threading.Lock()
+SessionThread = None
+
+def LaunchRecognitionSession():
+    global driver
+    try:
+        # Selenium is only imported here so other speech backends don't pay for it.
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        # Set Chrome options for the WebDriver.
+        chrome_options = Options()
+        chrome_options.add_argument(f"user-agent={user_agent}")
+        chrome_options.add_argument("--use-fake-ui-for-media-stream")
+        chrome_options.add_argument("--use-fake-device-for-media-stream")
+        # For debugging, comment out headless so the browser UI shows
+        # chrome_options.add_argument("--headless")
+
+        # Write the recognition page to a file.
+        with open("DataVoice.html", "w", encoding='utf-8') as f:
+            f.write(HtmlCode)
 
-# Function to set the assistant's status by writing it to a file.
+        # Initialize the Chrome WebDriver using the ChromeDriverManager and load the page once.
+        service = Service(ChromeDriverManager().install())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver.set_script_timeout(ResultWaitSeconds + 5)
+        driver.get(Link)
+    except Exception as e:
+        print(f"Error starting speech recognition: {e}")
+        driver = None
+    finally:
+        DriverReady.set()
+
+def StartRecognitionSession():
+    """Start Chrome and load the recognition page in a background thread, once."""
+    global SessionThread
+    with SessionLock:
+        if SessionThread is None:
+            DriverReady.clear()
+            SessionThread = threading.Thread(target=LaunchRecognitionSession, daemon=True)
+            SessionThread.start()
+
+def ResetRecognitionSession():
+    """Drop a broken session so the next utterance launches a fresh one."""
+    global driver, SessionThread
+    with SessionLock:
+        try:
+            if driver is not None:
+                driver.quit()
+        except Exception:
+            pass
+        driver = None
+        SessionThread = None
+
+# Function to set the assistant's status on the shared state bus.
 def SetAssistantStatus(Status):
-    temp_dir = f"{current_dir}/Frontend/Files"
-    os.makedirs(temp_dir, exist_ok=True)  # Create dir if missing
-    with open(f'{temp_dir}/Status.data', 'w', encoding='utf-8') as file:
-        file.write(Status)
+    Bus.Publish("Status", Status)
 
 # Function to modify a query to ensure proper punctuation and formatting.
 def QueryModifier(query):
@@ -119,37 +200,47 @@ def UniversalTranslator(Text):
         print(f"Translation error: {e}")
         return Text
 
-# Function to perform speech recognition using the WebDriver.
-def SpeechRecognition():
-    driver.get(Link)
-    driver.find_element(by=By.ID, value="start").click()
+# Function to wait for the final transcript from the warm WebDriver session; "" if nothing was heard.
+def RecognizeTranscript(timeout=60):
+    StartRecognitionSession()
+    DriverReady.wait()
+    if driver is None:
+        ResetRecognitionSession()
+        return ""
 
-    start_time = time.time()
-    timeout = 60  # seconds max to wait
+    try:
+        driver.execute_script("startRecognition();")
 
-    while True:
-        try:
-            Text = driver.find_element(by=By.ID, value='output').text
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            # Block inside the page until a transcript arrives or the wait slice ends.
+            wait_ms = int(min(ResultWaitSeconds, deadline - time.time()) * 1000)
+            Results = driver.execute_async_script("waitForResult(arguments[0], arguments[arguments.length - 1]);", wait_ms)
 
-            if Text:
-                driver.find_element(by=By.ID, value='end').click()
+            if Results:
+                driver.execute_script("stopRecognition();")
+                return " ".join(r.strip() for r in Results)
 
-                if InputLanguage.lower() == 'en' or 'en' in InputLanguage.lower():
-                    return QueryModifier(Text)
-                else:
-                    SetAssistantStatus("Translating .....")
-                    return QueryModifier(UniversalTranslator(Text))
+        print("Speech recognition timed out.")
+        driver.execute_script("stopRecognition();")
+        return ""
 
-            if time.time() - start_time > timeout:
-                print("Speech recognition timed out.")
-                driver.find_element(by=By.ID, value='end').click()
-                return ""
+    except Exception as e:
+        print(f"Error: {e}")
+        ResetRecognitionSession()
+        return ""
 
-            time.sleep(0.1)
+# Function to perform speech recognition using the warm WebDriver session.
+def SpeechRecognition(timeout=60):
+    Text = RecognizeTranscript(timeout)
+    if not Text:
+        return ""
 
-        except Exception as e:
-            print(f"Error: {e}")
-            break
+    if InputLanguage.lower() == 'en' or 'en' in InputLanguage.lower():
+        return QueryModifier(Text)
+    else:
+        SetAssistantStatus("Translating .....")
+        return QueryModifier(UniversalTranslator(Text))
 
 # Asynchronous function to call the SpeechRecognition in a non-blocking way
 async def AsyncSpeechRecognition():
@@ -0,0 +1,109 @@
+import time  # For phase timings
+import logging  # For reporting backends that fail to load
+import importlib  # For importing backends on demand
+import threading  # Loads backends in parallel
+from contextlib import contextmanager  # For timing phases with a with-block
+from Backend.StateBus import Bus  # Startup progress goes to the status line
+
+# Imported first by main.py, so this is close to when the process started.
+ProcessStarted = time.perf_counter()
+
+class StartupReport:
+    """Wall-clock timings of startup phases, relative to process start."""
+
+    def __init__(self):
+        self.Phases = []  # (Start, Duration, Thread, Name)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def Phase(self, Name):
+        Started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.Add(Name, Started, time.perf_counter() - Started)
+
+    def Mark(self, Name):
+        self.Add(Name, time.perf_counter(), 0.0)
+
+    def Add(self, Name, Started, Duration):
+        with self._lock:
+            self.Phases.append((Started - ProcessStarted, Duration, threading.current_thread().name, Name))
+
+    def Format(self):
+        with self._lock:
+            Phases = sorted(self.Phases)
+        Lines = [f"{'at':>8} {'took':>8}  {'thread':<12} phase"]
+        Lines += [f"{Start:7.3f}s {Duration:7.3f}s  {Thread[:12]:<12} {Name}" for Start, Duration, Thread, Name in Phases]
+        return "\n".join(Lines)
+
+Report = StartupReport()
+Bus.Subscribe("Gui", lambda Topic, Value: Report.Mark(f"gui {Value.lower()}"))
+
+class LazyModule:
+    """Stands in for a module until it is first used.
+
+    The first attribute access imports the module and runs Init(module);
+    other threads asking for it meanwhile wait for that load to finish, so
+    a module can also be loaded ahead of time in the background.
+    """
+
+    def __init__(self, Name, Label=None, Init=None):
+        self.Module = None
+        self.Name = Name
+        self.Label = Label or Name
+        self.Init = Init
+        self._lock = threading.Lock()
+
+    def Load(self):
+        with self._lock:
+            if self.Module is None:
+                with Report.Phase(f"import {self.Name}"):
+                    Module = importlib.import_module(self.Name)
+                if self.Init is not None:
+                    with Report.Phase(f"init {self.Name}"):
+                        self.Init(Module)
+                self.Module = Module
+        return self.Module
+
+    def __getattr__(self, Attribute):
+        return getattr(self.Load(), Attribute)
+
+def LoadAll(Modules):
+    """Load Modules one after another on this thread."""
+    for Module in Modules:
+        Module.Load()
+    Report.Mark("all backends ready")
+
+def LoadInBackground(Modules):
+    """Load Modules in parallel daemon threads, publishing progress to the status line.
+
+    Returns an Event that is set once every module has loaded or failed.
+    """
+    Ready = threading.Event()
+    Pending = {m.Label for m in Modules}
+    Lock = threading.Lock()
+
+    def Load(Module):
+        try:
+            Module.Load()
+        except Exception as e:
+            logging.error(f"Loading {Module.Name} failed: {e}")
+            Bus.Publish("Status", f"Could not load {Module.Label}")
+        with Lock:
+            Pending.discard(Module.Label)
+            Remaining = sorted(Pending)
+        if Remaining:
+            Bus.Publish("Status", f"Loading {', '.join(Remaining)}...")
+            return
+        Report.Mark("all backends ready")
+        print(Report.Format())
+        Ready.set()
+
+    if not Modules:
+        Ready.set()
+        return Ready
+    Bus.Publish("Status", f"Loading {', '.join(sorted(Pending))}...")
+    for Module in Modules:
+        threading.Thread(target=Load, args=(Module,), name=Module.Label, daemon=True).start()
+    return Ready
@@ -0,0 +1,118 @@
+import os  # For the file-backed adapter paths
+import queue  # Thread-safe queues for worker-side subscribers
+import threading  # Locks and condition variables
+import time  # Interval for the optional file watcher
+from dotenv import dotenv_values  # For reading environment variables
+
+# Load environment variables; external tools that write the .data files need WatchStateFiles=True.
+env_vars = dotenv_values(".env")
+WatchStateFiles = env_vars.get("WatchStateFiles", "False").lower() == "true"
+
+# Topics mirrored to Frontend/Files so external tools keep seeing the old protocol.
+MirroredFiles = {
+    "Mic": "Mic.data",
+    "Status": "Status.data",
+    "Responses": "Responses.data",
+}
+
+class StateBus:
+    """In-process publish/subscribe store for the assistant state shared between threads.
+
+    Every topic holds its latest value. Publishing wakes any thread blocked in
+    WaitFor and calls subscribers on the publishing thread, so subscribers that
+    touch widgets must hop threads themselves (see Frontend/Gui.py).
+    """
+
+    def __init__(self):
+        self._changed = threading.Condition()
+        self._values = {}
+        self._subscribers = {}
+
+    def Publish(self, Topic, Value):
+        with self._changed:
+            self._values[Topic] = Value
+            self._changed.notify_all()
+            Callbacks = self._subscribers.get(Topic, []) + self._subscribers.get("*", [])
+        for Callback in Callbacks:
+            Callback(Topic, Value)
+
+    def Get(self, Topic, Default=""):
+        with self._changed:
+            return self._values.get(Topic, Default)
+
+    def Subscribe(self, Topic, Callback):
+        """Call Callback(Topic, Value) on every publish of Topic ("*" for all topics)."""
+        with self._changed:
+            self._subscribers[Topic] = self._subscribers.get(Topic, []) + [Callback]
+        return lambda: self.Unsubscribe(Topic, Callback)
+
+    def Unsubscribe(self, Topic, Callback):
+        with self._changed:
+            self._subscribers[Topic] = [c for c in self._subscribers.get(Topic, []) if c is not Callback]
+
+    def Listen(self, Topic):
+        """Return a queue.Queue receiving (Topic, Value) for every publish of Topic."""
+        Updates = queue.Queue()
+        self.Subscribe(Topic, lambda Topic, Value: Updates.put((Topic, Value)))
+        return Updates
+
+    def WaitFor(self, Topic, Value, Timeout=None):
+        """Block until Topic holds Value. Returns False if Timeout elapsed first."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self._values.get(Topic) == Value, Timeout)
+
+class FileAdapter:
+    """Keeps the Frontend/Files/*.data files in sync with the bus for external tools."""
+
+    def __init__(self, Bus, Directory, Files=MirroredFiles):
+        self.Bus = Bus
+        self.Directory = Directory
+        self.Files = Files
+        self._written = {}
+        os.makedirs(Directory, exist_ok=True)
+
+        # Seed the bus with whatever the files held from the last run.
+        for Topic, Filename in Files.items():
+            try:
+                with open(os.path.join(Directory, Filename), "r", encoding="utf-8") as file:
+                    self._written[Topic] = file.read()
+                    Bus.Publish(Topic, self._written[Topic])
+            except FileNotFoundError:
+                pass
+        Bus.Subscribe("*", self.Write)
+
+    def Write(self, Topic, Value):
+        if Topic not in self.Files or self._written.get(Topic) == Value:
+            return
+        self._written[Topic] = Value
+        with open(os.path.join(self.Directory, self.Files[Topic]), "w", encoding="utf-8") as file:
+            file.write(Value)
+
+    def Watch(self, Interval=1.0):
+        """Republish values written to the files by external tools (checked via mtime only)."""
+        def Run():
+            Seen = {}
+            while True:
+                for Topic, Filename in self.Files.items():
+                    Path = os.path.join(self.Directory, Filename)
+                    try:
+                        Modified = os.stat(Path).st_mtime_ns
+                        if Seen.setdefault(Topic, Modified) == Modified:
+                            continue
+                        Seen[Topic] = Modified
+                        with open(Path, "r", encoding="utf-8") as file:
+                            Value = file.read()
+                    except OSError:
+                        continue
+                    if Value != self._written.get(Topic):
+                        self._written[Topic] = Value
+                        self.Bus.Publish(Topic, Value)
+                time.sleep(Interval)
+
+        threading.Thread(target=Run, daemon=True).start()
+
+# Shared bus instance for the whole process.
+Bus = StateBus()
+Files = FileAdapter(Bus, os.path.join(os.getcwd(), "Frontend", "Files"))
+if WatchStateFiles:
+    Files.Watch()
@@ -0,0 +1,46 @@
+import asyncio  # For running tasks concurrently
+from dotenv import dotenv_values  # For reading environment variables
+
+# Load environment variables
+env_vars = dotenv_values(".env")
+
+# Seconds a single decided task may take before it is given up on.
+CommandTimeout = float(env_vars.get("CommandTimeout", 30))
+AnswerTimeout = float(env_vars.get("AnswerTimeout", 60))
+
+AnswerKinds = ("general", "realtime")
+# Commands that wait on an LLM answer get the answer timeout.
+WrittenKinds = ("content",)
+
+def TaskTimeout(Task):
+    return AnswerTimeout if Task.startswith(AnswerKinds + WrittenKinds) else CommandTimeout
+
+def Dispatch(Tasks, Run, Timeout=TaskTimeout):
+    """Start Run(Task) for every task at once.
+
+    Returns an async iterator of (Task, Result) in the order of Tasks, so
+    each result is available as soon as it and the ones before it are done
+    and a turn costs its slowest task rather than the sum of all of them.
+    Result is the exception for a task that failed or ran past Timeout
+    seconds (a number, or a function of the task).
+    """
+    Running = [
+        asyncio.ensure_future(asyncio.wait_for(Run(Task), Timeout(Task) if callable(Timeout) else Timeout))
+        for Task in Tasks
+    ]
+
+    async def Results():
+        try:
+            for Task, Future in zip(Tasks, Running):
+                try:
+                    Result = await Future
+                except asyncio.TimeoutError:
+                    Result = TimeoutError(f"{Task!r} timed out")
+                except Exception as e:
+                    Result = e
+                yield Task, Result
+        finally:
+            for Future in Running:
+                Future.cancel()
+
+    return Results()
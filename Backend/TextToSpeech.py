@@ -2,8 +2,14 @@ import pygame
 import random
 import asyncio
 import edge_tts
+import io
 import os
+import re
+import threading
+import time
 from dotenv import dotenv_values
+from Backend.AudioCache import AudioCache
+from Backend.Tracing import Span, MarkTurn
 
 # Load environment variables
 env_vars = dotenv_values(".env")
@@ -12,69 +18,270 @@ AssistantVoice = env_vars.get("AssistantVoice", "en-US-AriaNeural")  # default v
 # Ensure the Data directory exists
 os.makedirs("Data", exist_ok=True)
 
-async def TextToAudioFile(text) -> None:
-    file_path = r"Data\speech.mp3"
-    if os.path.exists(file_path):
-        os.remove(file_path)
-    communicate = edge_tts.Communicate(text, AssistantVoice, pitch='+5Hz', rate='+13%')  # type: ignore
-    await communicate.save(file_path)
+# Voice settings used for every utterance; part of the audio cache key.
+VoicePitch = '+5Hz'
+VoiceRate = '+13%'
 
-async def TTS(Text, func=lambda r=None: True):
-    try:
-        await TextToAudioFile(Text)
+# Synthesized phrases are kept on disk so repeated ones play without a network round trip.
+# Only clauses up to MaxCachedPhraseLength characters are stored, which keeps
+# one-off answer sentences from pushing out the canned lines.
+PhraseCache = AudioCache(os.path.join("Data", "AudioCache"), int(env_vars.get("AudioCacheMB", 50)) * 1024 * 1024)
+MaxCachedPhraseLength = 200
+
+# Clause boundaries used to cut a streamed answer into speakable pieces.
+ClauseBoundary = re.compile(r"(?<=[.!?;:])\s+|\n+")
+CommaBoundary = re.compile(r"(?<=,)\s+")
+MinClauseLength = 20  # Avoid synthesizing tiny fragments like "Yes."
+MaxClauseLength = 200  # Fall back to splitting on commas when no sentence end arrives
+
+# Synthesized clauses waiting for playback; bounds memory when synthesis outruns speech.
+AudioBufferClauses = 2
+
+async def TextToAudioBytes(text) -> bytes:
+    """Synthesize text straight into memory from the edge_tts chunk stream, using the phrase cache."""
+    key = AudioCache.Key(text, AssistantVoice, VoicePitch, VoiceRate)
+    cacheable = len(text) <= MaxCachedPhraseLength
+    if cacheable:
+        cached = await asyncio.to_thread(PhraseCache.Get, key)
+        if cached is not None:
+            return cached
+
+    audio = bytearray()
+    communicate = edge_tts.Communicate(text, AssistantVoice, pitch=VoicePitch, rate=VoiceRate)  # type: ignore
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+
+    if cacheable and audio:
+        await asyncio.to_thread(PhraseCache.Put, key, bytes(audio))
+    return bytes(audio)
+
+async def PrewarmPhrases(Phrases, Concurrency=4):
+    """Synthesize any of Phrases missing from the phrase cache."""
+    Limit = asyncio.Semaphore(Concurrency)
+
+    async def Warm(Phrase):
+        if AudioCache.Key(Phrase, AssistantVoice, VoicePitch, VoiceRate) in PhraseCache:
+            return
+        async with Limit:
+            try:
+                await TextToAudioBytes(Phrase)
+            except Exception as e:
+                print(f"Error prewarming phrase: {e}")
+
+    await asyncio.gather(*(Warm(p) for p in Phrases))
 
-        pygame.mixer.init()
-        pygame.mixer.music.load(r"Data\speech.mp3")
-        pygame.mixer.music.play()
+def StartPrewarm(Phrases=()):
+    """Prewarm the canned responses plus Phrases in a background thread."""
+    Phrases = list(CannedResponses) + list(Phrases)
+    threading.Thread(target=lambda: asyncio.run(PrewarmPhrases(Phrases)), daemon=True).start()
 
-        while pygame.mixer.music.get_busy():
+class AudioOutput:
+    """One mixer channel that stays initialized for the life of the process.
+
+    Clips are decoded from memory; the next clip is queued on the channel
+    while the current one plays, so consecutive clauses run back to back.
+    """
+
+    def __init__(self):
+        self.Channel = None
+        self._lock = threading.Lock()
+
+    def Open(self):
+        with self._lock:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+                self.Channel = None
+            if self.Channel is None:
+                self.Channel = pygame.mixer.Channel(0)
+        return self.Channel
+
+    async def Wait(self, Condition, func):
+        """Sleep until Condition() is false; returns False if func asks to stop."""
+        while Condition():
             if func() is False:
-                break
-            pygame.time.Clock().tick(10)
+                self.Stop()
+                return False
+            await asyncio.sleep(0.05)
+        return True
 
+    async def Enqueue(self, Audio, func=lambda r=None: True):
+        Channel = self.Open()
+        Sound = pygame.mixer.Sound(file=io.BytesIO(Audio))
+        if not await self.Wait(lambda: Channel.get_queue() is not None, func):
+            return False
+        if Channel.get_busy():
+            Channel.queue(Sound)
+        else:
+            Channel.play(Sound)
         return True
 
+    async def Drain(self, func=lambda r=None: True):
+        Channel = self.Open()
+        return await self.Wait(Channel.get_busy, func)
+
+    def Stop(self):
+        if self.Channel is not None:
+            self.Channel.stop()
+
+Speaker = AudioOutput()
+
+async def SpeakClauses(Clauses, func=lambda r=None: True):
+    """Synthesize clauses from an async iterator one ahead of playback and play them."""
+    Ready = asyncio.Queue(maxsize=AudioBufferClauses)
+    Trace = Span("tts", voice=AssistantVoice)
+
+    async def Producer():
+        try:
+            async for Clause in Clauses:
+                if func() is False:
+                    break
+                Started = time.perf_counter()
+                Audio = await TextToAudioBytes(Clause)
+                Trace.Add("synthesis", round(time.perf_counter() - Started, 4))
+                Trace.Add("clauses")
+                Trace.Add("chars", len(Clause))
+                Trace.Add("bytes", len(Audio))
+                await Ready.put(Audio)
+        except Exception as e:
+            print(f"Error while synthesizing speech: {e}")
+        await Ready.put(None)
+
+    ProducerTask = asyncio.create_task(Producer())
+    try:
+        while True:
+            Audio = await Ready.get()
+            if Audio is None:
+                Finished = await Speaker.Drain(func)
+                if Finished is False:
+                    Trace.Set(interrupted=True)
+                return Finished
+            if await Speaker.Enqueue(Audio, func) is False:
+                Trace.Set(interrupted=True)
+                return False
+            Trace.First("ttfa")
+            MarkTurn("ttfa")
+
+    except asyncio.CancelledError:
+        Trace.Set(interrupted=True)
+        raise
+
     except Exception as e:
         print(f"Error in TTS: {e}")
 
     finally:
+        ProducerTask.cancel()
+        Trace.End()
         try:
             func(False)
-            pygame.mixer.music.stop()
-            pygame.mixer.quit()
+            Speaker.Stop()
         except Exception as e:
             print(f"Error in finally block: {e}")
 
+async def TTS(Text, func=lambda r=None: True):
+    async def Clauses():
+        for Clause in SentenceSegmenter([str(Text)]):
+            yield Clause
+
+    return await SpeakClauses(Clauses(), func)
+
+CannedResponses = [
+    "The rest of the result has been printed to the chat screen, kindly check it out sir.",
+    "The rest of the text is now on the chat screen, sir, please check it.",
+    "You can see the rest of the text on the chat screen, sir.",
+    "The remaining part of the text is now on the chat screen, sir.",
+    "Sir, you'll find more text on the chat screen for you to see.",
+    "The rest of the answer is now on the chat screen, sir.",
+    "Sir, please look at the chat screen, the rest of the answer is there.",
+    "You'll find the complete answer on the chat screen, sir.",
+    "The next part of the text is on the chat screen, sir.",
+    "Sir, please check the chat screen for more information.",
+    "There's more text on the chat screen for you, sir.",
+    "Sir, take a look at the chat screen for additional text.",
+    "You'll find more to read on the chat screen, sir.",
+    "Sir, check the chat screen for the rest of the text.",
+    "The chat screen has the rest of the text, sir.",
+    "There's more to see on the chat screen, sir, please look.",
+    "Sir, the chat screen holds the continuation of the text.",
+    "You'll find the complete answer on the chat screen, kindly check it out sir.",
+    "Please review the chat screen for the rest of the text, sir.",
+    "Sir, look at the chat screen for the complete answer."
+]
+
 async def TextToSpeech(Text, func=lambda r=None: True):
     Data = str(Text).split(".")
-    responses = [
-        "The rest of the result has been printed to the chat screen, kindly check it out sir.",
-        "The rest of the text is now on the chat screen, sir, please check it.",
-        "You can see the rest of the text on the chat screen, sir.",
-        "The remaining part of the text is now on the chat screen, sir.",
-        "Sir, you'll find more text on the chat screen for you to see.",
-        "The rest of the answer is now on the chat screen, sir.",
-        "Sir, please look at the chat screen, the rest of the answer is there.",
-        "You'll find the complete answer on the chat screen, sir.",
-        "The next part of the text is on the chat screen, sir.",
-        "Sir, please check the chat screen for more information.",
-        "There's more text on the chat screen for you, sir.",
-        "Sir, take a look at the chat screen for additional text.",
-        "You'll find more to read on the chat screen, sir.",
-        "Sir, check the chat screen for the rest of the text.",
-        "The chat screen has the rest of the text, sir.",
-        "There's more to see on the chat screen, sir, please look.",
-        "Sir, the chat screen holds the continuation of the text.",
-        "You'll find the complete answer on the chat screen, kindly check it out sir.",
-        "Please review the chat screen for the rest of the text, sir.",
-        "Sir, look at the chat screen for the complete answer."
-    ]
 
     if len(Data) > 4 and len(Text) >= 250:
-        await TTS(" ".join(Data[0:2]) + " . " + random.choice(responses), func)
+        await TTS(" ".join(Data[0:2]) + " . " + random.choice(CannedResponses), func)
     else:
         await TTS(Text, func)
 
+def FindClauseCut(Buffer):
+    """Return the span separating the first complete clause from the rest, if any."""
+    for Match in ClauseBoundary.finditer(Buffer, MinClauseLength):
+        return Match.span()
+    if len(Buffer) > MaxClauseLength:
+        for Match in CommaBoundary.finditer(Buffer, MinClauseLength):
+            return Match.span()
+    return None
+
+def SentenceSegmenter(Tokens):
+    """Cut a stream of tokens into clauses as soon as each clause is complete."""
+    Buffer = ""
+    for Token in Tokens:
+        Buffer += Token
+        while (Cut := FindClauseCut(Buffer)) is not None:
+            Clause, Buffer = Buffer[:Cut[0]].strip(), Buffer[Cut[1]:]
+            if Clause:
+                yield Clause
+    if Buffer.strip():
+        yield Buffer.strip()
+
+async def SpokenClauses(Tokens, func=lambda r=None: True):
+    """Turn a token stream into the clauses that should be spoken.
+
+    The first two clauses are released as soon as they are complete. After
+    that, clauses are held back until it is clear whether the answer is long;
+    long answers end with a pointer to the chat screen, like TextToSpeech,
+    while the remaining tokens are still consumed for the chat display.
+    """
+    Clauses = SentenceSegmenter(Tokens)
+
+    async def NextClause():
+        return await asyncio.to_thread(next, Clauses, None)
+
+    Count = 0
+    Spoken = 0
+    Pending = []
+    while func() is not False:
+        Clause = await NextClause()
+        if Clause is None:
+            break
+        if Count < 2:
+            # The first two sentences are always spoken right away.
+            Count += 1
+            Spoken += len(Clause)
+            yield Clause
+            continue
+        Pending.append(Clause)
+        if Count + len(Pending) > 4 and Spoken + sum(len(c) for c in Pending) >= 250:
+            # Long answer: point to the chat screen and let the rest stream silently.
+            yield random.choice(CannedResponses)
+            while await NextClause() is not None:
+                pass
+            return
+    for Clause in Pending:
+        yield Clause
+
+async def StreamingTextToSpeech(Tokens, func=lambda r=None: True):
+    """Speak an answer while it is still being generated.
+
+    Tokens is any iterable of text pieces (e.g. ChatBotStream). Clauses are
+    synthesized one ahead of playback, and long answers are cut short with a
+    pointer to the chat screen just like TextToSpeech.
+    """
+    return await SpeakClauses(SpokenClauses(Tokens, func), func)
+
 if __name__ == "__main__":
     try:
         while True:
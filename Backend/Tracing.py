@@ -0,0 +1,225 @@
+import os  # For trace file paths
+import json  # Trace records are JSON lines
+import time  # For span timings
+import uuid  # For turn and span ids
+import inspect  # To tell generators and coroutines from plain functions
+import logging  # For the rotating trace file
+import functools  # For wrapping traced functions
+import threading  # Guards trace file setup
+from contextvars import ContextVar  # Carries the current turn across threads and tasks
+from logging.handlers import RotatingFileHandler  # Size-bounded trace files
+from dotenv import dotenv_values  # For reading environment variables
+
+# Load environment variables
+env_vars = dotenv_values(".env")
+
+TracingEnabled = env_vars.get("Tracing", "True").lower() == "true"
+TracePath = env_vars.get("TracePath", os.path.join("Data", "Traces.jsonl"))
+TraceMaxBytes = int(env_vars.get("TraceMaxMB", 5)) * 1024 * 1024
+TraceBackups = int(env_vars.get("TraceBackups", 3))
+
+# Turn every span belongs to, the turn's own span, and the innermost function span.
+TurnId = ContextVar("TurnId", default=None)
+TurnSpan = ContextVar("TurnSpan", default=None)
+CurrentSpan = ContextVar("CurrentSpan", default=None)
+
+TraceLogger = None
+LoggerLock = threading.Lock()
+
+def GetTraceLogger():
+    global TraceLogger
+    with LoggerLock:
+        if TraceLogger is None:
+            os.makedirs(os.path.dirname(TracePath) or ".", exist_ok=True)
+            Handler = RotatingFileHandler(TracePath, maxBytes=TraceMaxBytes, backupCount=TraceBackups, encoding="utf-8")
+            Handler.setFormatter(logging.Formatter("%(message)s"))
+            TraceLogger = logging.getLogger("Jarvis.trace")
+            TraceLogger.setLevel(logging.INFO)
+            TraceLogger.propagate = False  # Keep spans out of chatbot.log.
+            TraceLogger.addHandler(Handler)
+        return TraceLogger
+
+class Span:
+    """One timed stage of a turn, written as a JSON line when it ends.
+
+    First(Key) records the time from the start of the span to a first
+    event (e.g. "ttft" for the first token, "ttfa" for the first audio);
+    Add and Set record counters such as bytes and tokens.
+    """
+
+    def __init__(self, Name, **Attributes):
+        self.Name = Name
+        self.Id = uuid.uuid4().hex[:12]
+        self.Turn = TurnId.get()
+        self.Started = time.time()
+        self._clock = time.perf_counter()
+        self.Attributes = Attributes
+        self.Ended = False
+
+    def Elapsed(self):
+        return time.perf_counter() - self._clock
+
+    def First(self, Key):
+        if Key not in self.Attributes:
+            self.Attributes[Key] = round(self.Elapsed(), 4)
+
+    def Add(self, Key, Amount=1):
+        self.Attributes[Key] = self.Attributes.get(Key, 0) + Amount
+
+    def Set(self, **Attributes):
+        self.Attributes.update(Attributes)
+
+    def End(self, Error=None):
+        if self.Ended or not TracingEnabled:
+            return
+        self.Ended = True
+        Record = {"span": self.Name, "id": self.Id, "turn": self.Turn, "start": round(self.Started, 4), "duration": round(self.Elapsed(), 4)}
+        Record.update(self.Attributes)
+        if Error is not None:
+            Record["error"] = f"{type(Error).__name__}: {Error}"
+        try:
+            GetTraceLogger().info(json.dumps(Record, default=str))
+        except OSError as e:
+            logging.error(f"Writing trace failed: {e}")
+
+def NewTurn():
+    """Start a new turn id; spans created in this context from now on belong to it."""
+    TurnId.set(uuid.uuid4().hex[:12])
+    TurnSpan.set(None)
+
+def StartTurn(**Attributes):
+    """Open the span covering the current turn from the recognized query to the last audio."""
+    Turn = Span("turn", **Attributes)
+    TurnSpan.set(Turn)
+    return Turn
+
+def MarkTurn(Key):
+    Turn = TurnSpan.get()
+    if Turn is not None:
+        Turn.First(Key)
+
+def Annotate(**Attributes):
+    """Add attributes to the innermost traced function call."""
+    Current = CurrentSpan.get()
+    if Current is not None:
+        Current.Set(**Attributes)
+
+def Measure(Result):
+    if isinstance(Result, (str, bytes)):
+        return {"bytes": len(Result.encode("utf-8") if isinstance(Result, str) else Result)}
+    if isinstance(Result, (list, tuple)):
+        return {"items": len(Result)}
+    return {}
+
+def TraceStream(Name, Tokens, **Attributes):
+    """Yield from Tokens, recording time to first token, chunks, bytes and tokens."""
+    from Backend.ContextWindow import CountTokens  # Imported here to keep this module dependency-free.
+
+    Current = Span(Name, **Attributes)
+    Parts = []
+    Error = None
+    try:
+        for Token in Tokens:
+            Current.First("ttft")
+            Parts.append(Token)
+            yield Token
+    except Exception as e:
+        Error = e
+        raise
+    finally:
+        Text = "".join(Parts)
+        Current.Set(chunks=len(Parts), bytes=len(Text.encode("utf-8")), tokens=CountTokens(Text))
+        Current.End(Error)
+
+def Traced(Name):
+    """Decorator recording a span for every call of a function, coroutine or generator."""
+    def Decorate(Function):
+        if inspect.isgeneratorfunction(Function):
+            @functools.wraps(Function)
+            def Stream(*Args, **Options):
+                return (yield from TraceStream(Name, Function(*Args, **Options)))
+            return Stream
+
+        if inspect.iscoroutinefunction(Function):
+            @functools.wraps(Function)
+            async def Coroutine(*Args, **Options):
+                Current = Span(Name)
+                Token = CurrentSpan.set(Current)
+                try:
+                    Result = await Function(*Args, **Options)
+                except Exception as e:
+                    Current.End(e)
+                    raise
+                finally:
+                    CurrentSpan.reset(Token)
+                Current.Set(**Measure(Result))
+                Current.End()
+                return Result
+            return Coroutine
+
+        @functools.wraps(Function)
+        def Call(*Args, **Options):
+            Current = Span(Name)
+            Token = CurrentSpan.set(Current)
+            try:
+                Result = Function(*Args, **Options)
+            except Exception as e:
+                Current.End(e)
+                raise
+            finally:
+                CurrentSpan.reset(Token)
+            Current.Set(**Measure(Result))
+            Current.End()
+            return Result
+        return Call
+    return Decorate
+
+def ReadTraces(Path=TracePath):
+    """Span records from the trace file and its rotated backups, oldest first."""
+    Paths = [f"{Path}.{i}" for i in range(TraceBackups, 0, -1)] + [Path]
+    for File in Paths:
+        if not os.path.exists(File):
+            continue
+        with open(File, "r", encoding="utf-8") as f:
+            for Line in f:
+                try:
+                    yield json.loads(Line)
+                except ValueError:
+                    continue
+
+def Percentile(Values, Fraction):
+    Values = sorted(Values)
+    return Values[min(len(Values) - 1, int(len(Values) * Fraction))]
+
+def Summarize(Records, Fields=("duration", "ttft", "ttfa")):
+    """{stage: {"count", "errors", "<field>_p50", "<field>_p95", ...}} over span records."""
+    Stages = {}
+    for Record in Records:
+        Stages.setdefault(Record["span"], []).append(Record)
+    Summary = {}
+    for Stage, Spans in Stages.items():
+        Row = {"count": len(Spans), "errors": sum(1 for s in Spans if "error" in s)}
+        for Field in Fields:
+            Values = [s[Field] for s in Spans if isinstance(s.get(Field), (int, float))]
+            if Values:
+                Row[f"{Field}_p50"] = Percentile(Values, 0.5)
+                Row[f"{Field}_p95"] = Percentile(Values, 0.95)
+        Summary[Stage] = Row
+    return Summary
+
+def FormatSummary(Summary, Fields=("duration", "ttft", "ttfa")):
+    Header = f"{'stage':<12}{'count':>7}{'errors':>8}" + "".join(f"{f + ' p50':>14}{f + ' p95':>14}" for f in Fields)
+    Lines = [Header]
+    for Stage, Row in sorted(Summary.items()):
+        Line = f"{Stage:<12}{Row['count']:>7}{Row['errors']:>8}"
+        for Field in Fields:
+            for Key in (f"{Field}_p50", f"{Field}_p95"):
+                Line += f"{Row[Key]:>13.3f}s" if Key in Row else f"{'-':>14}"
+        Lines.append(Line)
+    return "\n".join(Lines)
+
+# Per-stage latency summary of recorded traces: python -m Backend.Tracing [trace file]
+if __name__ == "__main__":
+    import sys
+
+    print(FormatSummary(Summarize(ReadTraces(sys.argv[1] if len(sys.argv) > 1 else TracePath))))
@@ -0,0 +1,169 @@
+import io  # For building WAV clips in memory
+import re  # For picking words out of queries
+import time  # For simulated latencies
+import wave  # Fake speech is silent 16 kHz WAV audio
+import asyncio  # The fake edge_tts stream is async
+import threading  # Servers run in daemon threads
+from urllib.parse import urlparse, parse_qs  # For reading fake search requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Local fake search engine
+from Backend.LLMGateway import FakeLLMServer  # Streaming Groq/Cohere stand-in
+from Backend.SpeechBackends import SpeechBackend  # Interface of the scripted recognizer
+
+__all__ = ["FakeLLMServer", "FakeSearchServer", "FakeSpeech", "ScriptedSpeechBackend", "Answer", "Decide"]
+
+Filler = (
+    "This is a simulated answer used to measure the assistant. "
+    "It is split into several sentences, so speech can start early. "
+    "Each clause is synthesized while the previous one is still playing, "
+    "and the rest of the answer keeps streaming in the background."
+).split(" ")
+
+RealtimeWords = re.compile(r"\b(today|now|latest|current|news|weather|price|score|stock|tonight)\b", re.I)
+
+def Answer(Words):
+    """Reply function for FakeLLMServer producing Words words about the last user message."""
+    def Reply(Messages):
+        Topic = " ".join(re.findall(r"\w+", Messages[-1]["content"])[:6])
+        Text = [f"About {Topic}."] + [Filler[i % len(Filler)] for i in range(Words)]
+        return " ".join(Text)
+    return Reply
+
+def Decide(Message):
+    """Decision function for FakeLLMServer: realtime for time-sensitive queries, general otherwise."""
+    return f"{'realtime' if RealtimeWords.search(Message) else 'general'} {Message}"
+
+class FakeSearchServer:
+    """Local search engine: a results page linking to Results local pages about the query.
+
+    Every response waits SearchDelay (results) or PageDelay (pages) seconds
+    first, like a remote server would. Use it with SearchEndpoint=<Url>/search.
+    """
+
+    def __init__(self, Port=0, Results=5, SearchDelay=0.15, PageDelay=0.1, Paragraphs=12):
+        self.Results = Results
+        self.SearchDelay = SearchDelay
+        self.PageDelay = PageDelay
+        self.Paragraphs = Paragraphs
+        self.Requests = 0
+        self.Server = ThreadingHTTPServer(("127.0.0.1", Port), self._handler())
+        self.Url = f"http://127.0.0.1:{self.Server.server_address[1]}"
+
+    def Start(self):
+        threading.Thread(target=self.Server.serve_forever, daemon=True).start()
+        return self.Url
+
+    def Stop(self):
+        self.Server.shutdown()
+
+    def ResultsPage(self, Query):
+        Links = "".join(f'<li><a href="{self.Url}/page/{i}?q={Query}">Result {i}</a></li>' for i in range(self.Results))
+        return f"<html><body><ul>{Links}</ul></body></html>"
+
+    def Page(self, Number, Query):
+        Words = re.findall(r"\w+", Query) or ["topic"]
+        Paragraphs = []
+        for i in range(self.Paragraphs):
+            # Only some paragraphs mention the query, so passage ranking has something to do.
+            Subject = " ".join(Words) if i % 3 == Number % 3 else "unrelated material"
+            Paragraphs.append(f"<p>Paragraph {i} of page {Number} discusses {Subject}. " + " ".join(Filler) + "</p>")
+        return f"<html><body><nav>Menu</nav><article>{''.join(Paragraphs)}</article></body></html>"
+
+    def _handler(self):
+        Fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *Args):
+                pass
+
+            def do_GET(self):
+                Fake.Requests += 1
+                Url = urlparse(self.path)
+                Query = parse_qs(Url.query).get("q", [""])[0]
+                if Url.path == "/search":
+                    time.sleep(Fake.SearchDelay)
+                    Body = Fake.ResultsPage(Query)
+                elif Url.path.startswith("/page/"):
+                    time.sleep(Fake.PageDelay)
+                    Body = Fake.Page(int(Url.path.rsplit("/", 1)[1]), Query)
+                else:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                Data = Body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(Data)))
+                self.end_headers()
+                self.wfile.write(Data)
+
+        return Handler
+
+def SilentWav(Seconds, Rate=16000):
+    Buffer = io.BytesIO()
+    with wave.open(Buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(Rate)
+        f.writeframes(b"\0\0" * int(Seconds * Rate))
+    return Buffer.getvalue()
+
+class FakeSpeech:
+    """Stand-in for edge_tts.Communicate that streams timed chunks of silent audio.
+
+    The first chunk arrives after FirstChunkDelay and the rest ChunkDelay
+    apart; clips last SecondsPerChar per character of text, so playback
+    takes about as long as speaking it would. Install it with
+    edge_tts.Communicate = FakeSpeech(...).
+    """
+
+    def __init__(self, FirstChunkDelay=0.15, ChunkDelay=0.01, SecondsPerChar=0.01, ChunkBytes=8192):
+        self.FirstChunkDelay = FirstChunkDelay
+        self.ChunkDelay = ChunkDelay
+        self.SecondsPerChar = SecondsPerChar
+        self.ChunkBytes = ChunkBytes
+        self.Requests = 0
+
+    def __call__(self, Text, Voice=None, **Options):
+        self.Requests += 1
+        return FakeCommunicate(self, Text)
+
+class FakeCommunicate:
+    def __init__(self, Speech, Text):
+        self.Speech = Speech
+        self.Audio = SilentWav(max(0.05, len(Text) * Speech.SecondsPerChar))
+
+    async def stream(self):
+        await asyncio.sleep(self.Speech.FirstChunkDelay)
+        for Start in range(0, len(self.Audio), self.Speech.ChunkBytes):
+            if Start:
+                await asyncio.sleep(self.Speech.ChunkDelay)
+            yield {"type": "audio", "data": self.Audio[Start:Start + self.Speech.ChunkBytes]}
+
+    async def save(self, Path):
+        Data = bytearray()
+        async for Chunk in self.stream():
+            Data.extend(Chunk["data"])
+        with open(Path, "wb") as f:
+            f.write(Data)
+
+class ScriptedSpeechBackend(SpeechBackend):
+    """Recognizer that 'hears' scripted utterances, each after SpeakingSeconds of simulated speech."""
+
+    def __init__(self, Utterances=(), SpeakingSeconds=0.3):
+        self.Utterances = list(Utterances)
+        self.SpeakingSeconds = SpeakingSeconds
+
+    def Say(self, *Utterances):
+        self.Utterances.extend(Utterances)
+
+    def Frames(self):
+        return iter(())
+
+    def Listen(self, timeout=60, OnPartial=None, **Options):
+        if not self.Utterances:
+            return ""
+        time.sleep(self.SpeakingSeconds)
+        return self.Utterances.pop(0)
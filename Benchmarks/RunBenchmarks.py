@@ -0,0 +1,192 @@
+"""Offline end-to-end benchmarks against local stand-ins for every remote service.
+
+Groq and Cohere are replaced by FakeLLMServer, the search engine by
+FakeSearchServer, edge_tts by FakeSpeech and the recognizer by a scripted
+backend, so the suite runs on a headless box with no network. Audio goes to
+SDL's dummy driver and Qt to its offscreen platform.
+
+For each corpus in Benchmarks/Corpora it times FirstLayerDMM, ChatBot,
+RealtimeSearchEngine and TextToSpeech on their own, then drives
+main.MainExecution through every turn and reports turn latency and time to
+first audio from the trace spans, plus CPU time and memory.
+
+    python -m Benchmarks.RunBenchmarks [--corpus Benchmarks/Corpora/General.json] [--token-rate 50] [--json results.json]
+"""
+import os  # For the isolated working directory
+import sys  # For the import path
+import json  # For corpora and results
+import glob  # For finding corpora
+import time  # For timings
+import socket  # For picking free ports for the fake servers
+import asyncio  # TextToSpeech is a coroutine
+import argparse  # For the command line
+import resource  # For CPU time and peak memory
+import tempfile  # For the isolated working directory
+
+Repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DefaultCorpora = os.path.join(Repository, "Benchmarks", "Corpora", "*.json")
+
+def FreePort():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def Memory():
+    """Current and peak resident set size in MB."""
+    with open("/proc/self/statm") as f:
+        Current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    Peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Reported in KB on Linux
+    return Current / 2**20, max(Current, Peak) / 2**20
+
+def Percentiles(Values):
+    if not Values:
+        return {}
+    Values = sorted(Values)
+    return {"p50": Values[len(Values) // 2], "p95": Values[min(len(Values) - 1, int(len(Values) * 0.95))], "n": len(Values)}
+
+class Phase:
+    """Wall and CPU time of a block of work."""
+
+    def __enter__(self):
+        self.Wall, self.Cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *Error):
+        self.Wall, self.Cpu = time.perf_counter() - self.Wall, time.process_time() - self.Cpu
+
+def Prepare(Args):
+    """Write the benchmark .env into a fresh working directory and switch to it.
+
+    Every module reads .env from the working directory at import time, so
+    this must run before anything from the repository is imported.
+    """
+    LLMPort, SearchPort = FreePort(), FreePort()
+    # Nested, since Gui builds Windows-style paths that land next to the working directory on Linux.
+    Work = os.path.join(tempfile.mkdtemp(prefix="jarvis-bench-"), "run")
+    os.makedirs(Work)
+    Settings = {
+        "Username": "Bench",
+        "Assistantname": "Jarvis",
+        "GroqAPIKey": "fake",
+        "CohereAPIKey": "fake",
+        "LLMFakeServer": f"http://127.0.0.1:{LLMPort}",
+        "SearchEndpoint": f"http://127.0.0.1:{SearchPort}/search",
+        "StreamingMode": str(not Args.no_streaming),
+        "ResponseCache": str(Args.response_cache),
+        "BargeIn": "False",
+        "OverlapListening": "False",
+        "LazyStartup": "False",
+        "Tracing": "True",
+    }
+    with open(os.path.join(Work, ".env"), "w", encoding="utf-8") as f:
+        f.writelines(f"{Key}={Value}\n" for Key, Value in Settings.items())
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.chdir(Work)
+    sys.path.insert(0, Repository)
+    return LLMPort, SearchPort
+
+def TimeCalls(Function, Inputs):
+    Seconds = []
+    for Input in Inputs:
+        Started = time.perf_counter()
+        Function(Input)
+        Seconds.append(time.perf_counter() - Started)
+    return Percentiles(Seconds)
+
+def RunCorpus(Corpus, Args, Modules):
+    main, Recognizer, Tracing = Modules
+    Turns = Corpus["turns"] * Args.repeat
+    Result = {"corpus": Corpus["name"], "turns": len(Turns)}
+
+    # End to end first, while the decision and search caches are cold: one scripted utterance per MainExecution call.
+    Before = {Record["id"] for Record in Tracing.ReadTraces()}
+    Recognizer.Say(*Turns)
+    with Phase() as Conversation:
+        for _ in Turns:
+            main.MainExecution()
+    Spans = [r for r in Tracing.ReadTraces() if r["id"] not in Before and r.get("turn")]
+    Result["turn"] = Percentiles([s["duration"] for s in Spans if s["span"] == "turn"])
+    Result["ttfa"] = Percentiles([s["ttfa"] for s in Spans if s["span"] == "turn" and "ttfa" in s])
+    Result["stages"] = {Stage: Row for Stage, Row in Tracing.Summarize(Spans).items() if Stage != "turn"}
+    Result["conversation_wall"] = Conversation.Wall
+    Result["conversation_cpu"] = Conversation.Cpu
+
+    with Phase() as Components:
+        Result["decision"] = TimeCalls(main.Model.FirstLayerDMM, Turns)
+        Result["chatbot"] = TimeCalls(main.Chat.ChatBot, Turns)
+        Result["realtime"] = TimeCalls(main.Search.RealtimeSearchEngine, Turns)
+        Answer = main.Chat.ChatBot(Turns[0])
+        Result["tts"] = TimeCalls(lambda Text: asyncio.run(main.Voice.TextToSpeech(Text)), [Answer] * min(3, len(Turns)))
+    Result["components_cpu"] = Components.Cpu
+    Result["rss_mb"], Result["peak_rss_mb"] = Memory()
+    return Result
+
+def Report(Results):
+    def Cell(Stats, Key="p50"):
+        return f"{Stats[Key]:.3f}s" if Stats and Key in Stats else "-"
+
+    Header = f"{'corpus':<10}{'turns':>6}{'turn p50':>10}{'turn p95':>10}{'ttfa p50':>10}{'ttfa p95':>10}{'cpu':>8}{'rss':>8}{'peak':>8}"
+    Lines = [Header]
+    for r in Results:
+        Lines.append(
+            f"{r['corpus']:<10}{r['turns']:>6}{Cell(r['turn']):>10}{Cell(r['turn'], 'p95'):>10}"
+            f"{Cell(r['ttfa']):>10}{Cell(r['ttfa'], 'p95'):>10}{r['conversation_cpu']:>7.2f}s"
+            f"{r['rss_mb']:>6.0f}MB{r['peak_rss_mb']:>6.0f}MB"
+        )
+    Lines.append("")
+    Lines.append(f"{'corpus':<10}" + "".join(f"{Name + ' p50':>15}" for Name in ("decision", "chatbot", "realtime", "tts")))
+    for r in Results:
+        Lines.append(f"{r['corpus']:<10}" + "".join(f"{Cell(r[Name]):>15}" for Name in ("decision", "chatbot", "realtime", "tts")))
+    return "\n".join(Lines)
+
+def Main():
+    Parser = argparse.ArgumentParser(description="Offline latency benchmarks for the assistant.")
+    Parser.add_argument("--corpus", action="append", help="Corpus JSON file (default: all in Benchmarks/Corpora)")
+    Parser.add_argument("--repeat", type=int, default=1, help="Times to run through each corpus")
+    Parser.add_argument("--token-rate", type=float, default=50.0, help="Fake LLM tokens per second")
+    Parser.add_argument("--first-token", type=float, default=0.3, help="Fake LLM time to first token in seconds")
+    Parser.add_argument("--answer-words", type=int, default=60, help="Words in every fake answer")
+    Parser.add_argument("--search-delay", type=float, default=0.15, help="Fake search and page latency in seconds")
+    Parser.add_argument("--tts-first-chunk", type=float, default=0.15, help="Fake TTS time to first audio chunk in seconds")
+    Parser.add_argument("--speaking", type=float, default=0.3, help="Seconds the scripted user speaks per turn")
+    Parser.add_argument("--no-streaming", action="store_true", help="Benchmark with StreamingMode=False")
+    Parser.add_argument("--response-cache", action="store_true", help="Benchmark with ResponseCache=True")
+    Parser.add_argument("--json", help="Also write the results to this JSON file")
+    Args = Parser.parse_args()
+    Corpora = [os.path.abspath(p) for p in (Args.corpus or sorted(glob.glob(DefaultCorpora)))]
+    JsonPath = os.path.abspath(Args.json) if Args.json else None
+
+    LLMPort, SearchPort = Prepare(Args)
+
+    import edge_tts  # type: ignore
+    from Backend import SpeechBackends, Tracing
+    from Benchmarks.Fakes import FakeLLMServer, FakeSearchServer, FakeSpeech, ScriptedSpeechBackend, Answer, Decide
+
+    FakeLLMServer(Reply=Answer(Args.answer_words), Decide=Decide, Port=LLMPort, TokenDelay=1 / Args.token_rate, FirstTokenDelay=Args.first_token).Start()
+    FakeSearchServer(Port=SearchPort, SearchDelay=Args.search_delay, PageDelay=Args.search_delay).Start()
+    edge_tts.Communicate = FakeSpeech(FirstChunkDelay=Args.tts_first_chunk)
+    Recognizer = ScriptedSpeechBackend(SpeakingSeconds=Args.speaking)
+    SpeechBackends.ActiveBackend = Recognizer
+
+    with Phase() as Startup:
+        import main
+        # The corpora hold no commands, and CommandInterpreter needs desktop-only packages.
+        main.LoadAll([m for m in main.Backends if m is not main.Commands])
+    print(f"Startup: {Startup.Wall:.2f}s wall, {Startup.Cpu:.2f}s CPU")
+
+    Results = []
+    for Path in Corpora:
+        with open(Path, "r", encoding="utf-8") as f:
+            Corpus = json.load(f)
+        print(f"Running {Corpus['name']} ({len(Corpus['turns']) * Args.repeat} turns)...")
+        Results.append(RunCorpus(Corpus, Args, (main, Recognizer, Tracing)))
+
+    print()
+    print(Report(Results))
+    if JsonPath:
+        with open(JsonPath, "w", encoding="utf-8") as f:
+            json.dump({"startup": Startup.Wall, "results": Results}, f, indent=4)
+
+if __name__ == "__main__":
+    Main()
@@ -1,29 +1,43 @@
-from AppOpener import open as appopen
+from AppOpener import open as appopen, close as appclose
 from webbrowser import open as webopen
 from pywhatkit import search, playonyt  # type: ignore
+from urllib.parse import quote_plus
+from datetime import datetime, timedelta
 from dotenv import dotenv_values
-from bs4 import BeautifulSoup
 from rich import print
-from groq import Groq
+from Backend.LLMGateway import ChatStream
+from Backend.ChatLogStore import ChatLogStore
+from Backend.ContextWindow import ContextWindow
+from Frontend.Gui import ShowStreamToScreen, AnswerModifier
+from Backend.Tracing import Traced
+from Backend.StateBus import Bus
+from Backend.TaskDispatcher import AnswerTimeout
+from Backend.CommandRegistry import Registry
+from Backend.SearchPipeline import RunSearchAsync, SearchUrls
 import subprocess
-import requests
+import threading
 import keyboard
 import asyncio
+import json
+import time
 import os
+import re
 
 
 # Load environment variables
 env_vars = dotenv_values(".env")
-GroqAPIKey = env_vars.get("GroqAPIKey")
 
-# Initialize Groq client
-client = Groq(api_key=GroqAPIKey)
+Assistantname = env_vars.get("Assistantname", "Assistant")
 
-# For Google scraping
-useragent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36'
+# Stream written content into a file and the chat as it is generated, replying with a short confirmation.
+ContentStreaming = env_vars.get("ContentStreaming", "True").lower() == "true"
+ContentDirectory = env_vars.get("ContentDirectory", os.path.join("Data", "Content"))
+ContentTokenBudget = int(env_vars.get("ContentTokenBudget", 3000))
+ContentRefreshSeconds = 0.05  # Shortest gap between chat updates of a streamed document
 
-# For content generation memory
-messages = []
+# For content generation memory: kept out of the chat log and fitted into ContentTokenBudget.
+ContentLog = ChatLogStore(os.path.join("Data", "ContentLog.jsonl"), LegacyPath=None, TailSize=20)
+ContentContext = ContextWindow(Store=ContentLog, Budget=ContentTokenBudget)
 
 # Setup for system role
 username = os.environ.get("Username", "Assistant")
@@ -32,32 +46,74 @@ SystemChatBot = [{
     "content": f"Hello, I am {username}, You're a content writer. You have to write content like letters, articles, and blogs in a professional manner."
 }]
 
+# Read by the separate image generator, which waits for "<prompt>,True".
+ImageGenerationPath = os.path.join("Frontend", "Files", "ImageGeneration.data")
+RemindersPath = os.path.join("Data", "Reminders.jsonl")
+
+# Keys pressed for "system <action>" commands, matched on the wordings the classifier and the
+# decision model produce ("mute", "volume up", "increase the volume", "turn the volume down", ...).
+# "volume mute" toggles and the mute state is unknown, so "unmute" is not offered.
+SystemKeys = [
+    (re.compile(r"\bmute\b"), "volume mute"),
+    (re.compile(r"\b(?:increase|raise|turn up)\b.*\b(?:volume|sound)\b|\b(?:volume|sound)\b.*\b(?:up|higher)\b|\blouder\b"), "volume up"),
+    (re.compile(r"\b(?:decrease|lower|reduce|turn down)\b.*\b(?:volume|sound)\b|\b(?:volume|sound)\b.*\b(?:down|lower)\b|\bquieter\b"), "volume down"),
+]
+
 # ========== Core Functionalities ==========
 
+def StreamContent(prompt):
+    """Yield the content for prompt as it is generated, then remember the exchange."""
+    message = {"role": "user", "content": prompt}
+    parts = []
+    for Token in ChatStream(
+        ContentContext.Build(SystemChatBot, message, MaxTokens=2048),
+        Model="mixtral-8x7b-32768",
+        Name="content",
+        max_tokens=2048,
+        temperature=0.7,
+        top_p=1,
+        stop=None
+    ):
+        Token = Token.replace("</s>", "")
+        parts.append(Token)
+        yield Token
+    ContentLog.Extend([message, {"role": "assistant", "content": "".join(parts)}])
+
+def ContentFilePath(prompt):
+    name = re.sub(r"\W+", "_", prompt).strip("_")[:60] or "content"
+    return os.path.join(ContentDirectory, f"{name}.txt")
+
+def WriteContent(prompt):
+    """Write the content for prompt to its file and the chat chunk by chunk; returns the file path."""
+    path = ContentFilePath(prompt)
+    os.makedirs(ContentDirectory, exist_ok=True)
+    stream = f"content {path} {time.monotonic()}"
+    text = ""
+    shown = 0.0
+    try:
+        with open(path, "w", encoding="utf-8") as file:
+            for Token in StreamContent(prompt):
+                file.write(Token)
+                file.flush()
+                text += Token
+                if time.monotonic() - shown >= ContentRefreshSeconds:
+                    ShowStreamToScreen(stream, f"{Assistantname} : {AnswerModifier(text)}")
+                    shown = time.monotonic()
+    finally:
+        ShowStreamToScreen(stream, f"{Assistantname} : {AnswerModifier(text)}", Done=True)
+    return path
+
+@Registry.Register("content", Timeout=AnswerTimeout)
 def ContentWriterAI(prompt):
-    messages.append({"role": "user", "content": prompt})
     try:
-        completion = client.chat.completions.create(
-            model="mixtral-8x7b-32768",
-            messages=SystemChatBot + messages,
-            max_tokens=2048,
-            temperature=0.7,
-            top_p=1,
-            stream=True,
-            stop=None
-        )
-        Answer = ""
-        for chunk in completion:
-            if chunk.choices[0].delta.content:
-                Answer += chunk.choices[0].delta.content
-
-        Answer = Answer.replace("</s>", "")
-        messages.append({"role": "assistant", "content": Answer})
-        return Answer
+        if ContentStreaming:
+            return f"I have written it to {WriteContent(prompt)}."
+        return "".join(StreamContent(prompt))
     except Exception as e:
         print(f"[red]Error generating content:[/red] {e}")
         return "An error occurred while generating content."
 
+@Registry.Register("play")
 def PlayYoutube(query):
     try:
         playonyt(query)
@@ -66,6 +122,7 @@ def PlayYoutube(query):
         print(f"[red]Error playing video:[/red] {e}")
         return "Could not play video."
 
+@Registry.Register("open")
 def OpenApp(app):
     try:
         appopen(app, match_closest=True, output=True, throw_error=True)
@@ -74,74 +131,131 @@ def OpenApp(app):
         print(f"[red]Error opening app {app}:[/red] {e}")
         return f"Could not open {app}."
 
-def extract_links(html):
-    if html is None:
-        return []
-    soup = BeautifulSoup(html, 'html.parser')
-    links = soup.find_all('a', {'jsname': 'UWckNb'})
-    return [link.get('href') for link in links]
+@Registry.Register("open youtube", Exact=True)
+def OpenYoutube(_):
+    webopen("https://www.youtube.com")
+    return "Opening YouTube."
 
-def search_google(query):
-    url = f"https://www.google.com/search?q={query}"
-    headers = {"User-Agent": useragent}
+@Registry.Register("close")
+def CloseApp(app):
     try:
-        response = requests.get(url, headers=headers)
-        return response.text if response.status_code == 200 else None
+        appclose(app, match_closest=True, output=True, throw_error=True)
+        return f"Closing {app}."
     except Exception as e:
-        print(f"[red]Error retrieving Google search results:[/red] {e}")
-        return None
+        print(f"[red]Error closing app {app}:[/red] {e}")
+        return f"Could not close {app}."
+
+@Registry.Register("close youtube", Kind="async", Exact=True)
+async def CloseYoutube(_):
+    try:
+        # Warning: closes all Chrome instances
+        Process = await asyncio.create_subprocess_exec(
+            "taskkill", "/f", "/im", "chrome.exe",
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        await Process.wait()
+        return "Closing YouTube."
+    except OSError as e:
+        print(f"[red]Error closing YouTube:[/red] {e}")
+        return "Could not close YouTube."
+
+@Registry.Register("google search", Kind="async")
+async def GoogleSearch(query):
+    # Shares the realtime search engine's pooled client, rate limit and result cache.
+    links = await RunSearchAsync(SearchUrls(query, 1))
+    if not links:
+        print("[yellow]No links found in the search results.[/yellow]")
+        return f"I couldn't find anything for {query}."
+    await Registry.Offload(webopen, links[0])
+    return f"Searching Google for {query}."
+
+@Registry.Register("youtube search")
+def YoutubeSearch(query):
+    webopen(f"https://www.youtube.com/results?search_query={quote_plus(query)}")
+    return f"Searching YouTube for {query}."
+
+@Registry.Register("system")
+def System(action):
+    key = next((key for pattern, key in SystemKeys if pattern.search(action)), None)
+    if key is None:
+        return f"I can't {action} yet."
+    keyboard.press_and_release(key)
+    return f"Done, {action}."
+
+@Registry.Register("generate image")
+def GenerateImage(prompt):
+    with open(ImageGenerationPath, "w", encoding="utf-8") as file:
+        file.write(f"{prompt},True")
+    return f"Generating images of {prompt}."
+
+def ParseReminder(text, now=None):
+    """Split "9:00pm 25th june business meeting" into (due datetime or None, what)."""
+    now = now or datetime.now()
+    match = re.match(
+        r"(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<half>am|pm)"
+        r"(?:\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?\s+(?P<month>[a-z]+))?\s*(?P<what>.*)",
+        text
+    )
+    if not match:
+        return None, text
+    hour = int(match["hour"]) % 12 + (12 if match["half"] == "pm" else 0)
+    try:
+        due = now.replace(hour=hour, minute=int(match["minute"] or 0), second=0, microsecond=0)
+        if match["month"]:
+            due = due.replace(month=datetime.strptime(match["month"][:3], "%b").month, day=int(match["day"]))
+    except ValueError:
+        return None, text
+    if due <= now:
+        due = due.replace(year=due.year + 1) if match["month"] else due + timedelta(days=1)
+    return due, match["what"] or text
+
+def ScheduleReminder(due, what):
+    delay = (due - datetime.now()).total_seconds()
+    if delay > 0:
+        timer = threading.Timer(delay, Bus.Publish, args=("Responses", f"Reminder : {what}"))
+        timer.daemon = True
+        timer.start()
+
+@Registry.Register("reminder")
+def Reminder(text):
+    due, what = ParseReminder(text)
+    if due is None:
+        return f"I couldn't tell when to remind you about {text}."
+    os.makedirs(os.path.dirname(RemindersPath), exist_ok=True)
+    with open(RemindersPath, "a", encoding="utf-8") as file:
+        file.write(json.dumps({"due": due.isoformat(), "what": what}) + "\n")
+    ScheduleReminder(due, what)
+    return f"Reminder set for {due:%I:%M %p on %d %B}: {what}."
+
+def RestoreReminders():
+    """Schedule reminders saved by earlier runs that are still due."""
+    if not os.path.exists(RemindersPath):
+        return
+    with open(RemindersPath, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                saved = json.loads(line)
+                ScheduleReminder(datetime.fromisoformat(saved["due"]), saved["what"])
+            except (ValueError, KeyError):
+                continue
+
+RestoreReminders()
 
 # ========== Main Executor ==========
 
+@Traced("commands")
 async def TranslateAndExecute(commands: list[str]):
-    funcs = []
+    runnable = []
 
     for command in commands:
         if isinstance(command, str):
             command = command.lower().strip()
-
-            # Google search
-            if command.startswith("google search "):
-                query = command.removeprefix("google search ")
-                html = search_google(query)
-                if html:
-                    links = extract_links(html)
-                    if links:
-                        webopen(links[0])
-                    else:
-                        print("[yellow]No links found in the search results.[/yellow]")
-                else:
-                    print("[red]Failed to retrieve HTML for search.[/red]")
-
-            # Open YouTube
-            elif command == "open youtube":
-                webopen("https://www.youtube.com")
-                print("[green]Opening YouTube...[/green]")
-
-            # Close YouTube (force closes Chrome)
-            elif command == "close youtube":
-                os.system("taskkill /f /im chrome.exe")  # Warning: closes all Chrome instances
-                print("[green]Closing YouTube (Chrome)...[/green]")
-
-            # Play YouTube
-            elif command.startswith("play "):
-                funcs.append(asyncio.to_thread(PlayYoutube, command.removeprefix("play ")))
-
-            # Content generation
-            elif command.startswith("content "):
-                funcs.append(asyncio.to_thread(ContentWriterAI, command.removeprefix("content ")))
-
-            # App opening
-            elif command.startswith("open "):
-                funcs.append(asyncio.to_thread(OpenApp, command.removeprefix("open ")))
-
-            else:
+            if Registry.Find(command)[0] is None:
                 print(f"[yellow]No function found for:[/yellow] {command}")
+            else:
+                runnable.append(command)
         else:
             print(f"[yellow]Skipping invalid command (not a string):[/yellow] {command}")
 
-    try:
-        return await asyncio.gather(*funcs)
-    except Exception as e:
-        print(f"[red]Error executing commands:[/red] {e}")
-        return None
+    # Every handler runs off the event loop or natively async, each with its own timeout.
+    return await Registry.RunAll(runnable)
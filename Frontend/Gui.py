@@ -1,15 +1,29 @@
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTextEdit, QStackedWidget, QWidget, QLineEdit, QGridLayout, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QSizePolicy
-from PyQt5.QtGui import QIcon, QMovie, QColor, QTextCharFormat, QFont, QPixmap, QTextBlockFormat
-from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtWidgets import QApplication, QMainWindow, QListView, QStyledItemDelegate, QStackedWidget, QWidget, QLineEdit, QGridLayout, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QSizePolicy
+from PyQt5.QtGui import QIcon, QColor, QFont, QPixmap, QImageReader
+from PyQt5.QtCore import Qt, QSize, QRect, QEvent, QTimer, QObject, QAbstractListModel, QModelIndex, pyqtSignal
+from collections import Counter, OrderedDict
 from dotenv import dotenv_values
+from Backend.StateBus import Bus
+from Backend.ChatLogStore import ChatLog
 import sys
 import os
+import time
+import bisect
 
 # Load environment variables from a .env file
 env_vars = dotenv_values(".env")
+Username = env_vars.get("Username", "User")
 Assistantname = env_vars.get("Assistantname")
+# Messages loaded from the chat log at startup and per scroll to the top of the chat.
+ChatPageSize = int(env_vars.get("ChatPageSize", 50))
+# Frame rate of the assistant animation per state, and memory for its pre-scaled frames.
+AnimationFps = {
+    "idle": int(env_vars.get("AnimationIdleFps", 5)),
+    "listening": int(env_vars.get("AnimationListeningFps", 15)),
+    "speaking": int(env_vars.get("AnimationSpeakingFps", 30)),
+}
+AnimationCacheBytes = int(env_vars.get("AnimationCacheMB", 128)) * 1024 * 1024
 current_dir = os.getcwd()
-old_chat_message = ""
 TempdirPath = rf"{current_dir}\Frontend\Files"
 GraphicsDirPath = rf"{current_dir}\Frontend\Graphics"
 
@@ -37,22 +51,19 @@ def QueryModifier(Query):
     return new_query.capitalize()
 
 def SetMicrophoneStatus(Command):
-    with open(rf"{TempdirPath}\Mic.data", "w", encoding="utf-8") as file:
-        file.write(Command)
+    Bus.Publish("Mic", Command)
 
 def GetMicrophoneStatus():
-    with open(rf"{TempdirPath}\Mic.data", "r", encoding="utf-8") as file:
-        Status = file.read()
-    return Status
+    return Bus.Get("Mic")
+
+def WaitForMicrophoneStatus(Status, Timeout=None):
+    return Bus.WaitFor("Mic", Status, Timeout)
 
 def SetAssistantStatus(Status):
-    with open(rf"{TempdirPath}\Status.data", "w", encoding="utf-8") as file:
-        file.write(Status)
+    Bus.Publish("Status", Status)
 
 def GetAssistantStatus():
-    with open(rf"{TempdirPath}\Status.data", "r", encoding="utf-8") as file:
-        Status = file.read()
-    return Status
+    return Bus.Get("Status")
 
 def MicButtonInitialed():
     SetMicrophoneStatus("False")
@@ -69,8 +80,254 @@ def TempDirectoryPath(Filename):
     return Path
 
 def ShowTextToScreen(Text):
-    with open(rf"{TempdirPath}\Responses.data", "w", encoding="utf-8") as file:
-        file.write(Text)
+    Bus.Publish("Responses", Text)
+
+def ShowStreamToScreen(Stream, Text, Done=False):
+    """Show the text of a streamed answer so far, rewriting its chat row in place.
+
+    The Done text is also published to Responses like any other message.
+    """
+    Bus.Publish("ResponseStream", (str(Stream), Text, Done))
+    if Done:
+        ShowTextToScreen(Text)
+
+class BusSignals(QObject):
+    # Re-emits bus publishes as a Qt signal so widgets update on the GUI thread.
+    changed = pyqtSignal(str, str)
+    streamed = pyqtSignal(str, str, bool)
+
+BusBridge = BusSignals()
+# Streamed answers have their own signal; stringifying every token for the state slots is wasted work.
+Bus.Subscribe("*", lambda Topic, Value: Topic != "ResponseStream" and BusBridge.changed.emit(Topic, str(Value)))
+Bus.Subscribe("ResponseStream", lambda Topic, Value: BusBridge.streamed.emit(*Value))
+
+def FormatLoggedMessage(Message):
+    if Message["role"] == "user":
+        return f"{Username} : {Message['content']}"
+    return f"{Assistantname} : {AnswerModifier(Message['content'])}"
+
+class ChatModel(QAbstractListModel):
+    """Messages of the chat section, one row each.
+
+    Starts with the last PageSize messages of the chat log and pages earlier
+    ones in with LoadOlder, so the full history is never held in memory.
+    New messages append a single row; a streamed answer owns one row that is
+    rewritten as its text grows.
+    """
+
+    def __init__(self, PageSize=ChatPageSize):
+        super().__init__()
+        self.PageSize = PageSize
+        self.Rows = []
+        self.Oldest = len(ChatLog)  # Log index of the first row loaded from the log
+        self.Streams = {}  # Stream id -> row
+        self.Echoes = Counter()  # Finished stream texts still to arrive on Responses
+        self.LoadOlder()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.Rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.Rows[index.row()]
+        return None
+
+    def LoadOlder(self):
+        """Insert the previous page of the chat log at the top; returns the number of rows added."""
+        Start = max(0, self.Oldest - self.PageSize)
+        Messages = ChatLog.Page(Start, self.Oldest)
+        if not Messages:
+            return 0
+        self.beginInsertRows(QModelIndex(), 0, len(Messages) - 1)
+        self.Rows[:0] = [FormatLoggedMessage(m) for m in Messages]
+        self.Streams = {Stream: Row + len(Messages) for Stream, Row in self.Streams.items()}
+        self.Oldest = Start
+        self.endInsertRows()
+        return len(Messages)
+
+    def Append(self, Text):
+        if self.Echoes[Text]:
+            self.Echoes.subtract([Text])
+            self.Echoes += Counter()  # Drop used-up texts
+            return
+        self.beginInsertRows(QModelIndex(), len(self.Rows), len(self.Rows))
+        self.Rows.append(Text)
+        self.endInsertRows()
+
+    def Stream(self, Stream, Text, Done):
+        if Stream in self.Streams:
+            Row = self.Streams[Stream]
+            self.Rows[Row] = Text
+            self.dataChanged.emit(self.index(Row), self.index(Row))
+        else:
+            self.Append(Text)
+            self.Streams[Stream] = len(self.Rows) - 1
+        if Done:
+            del self.Streams[Stream]
+            self.Echoes[Text] += 1
+
+class ChatDelegate(QStyledItemDelegate):
+    """Paints a message as word-wrapped text; the view only asks for visible rows.
+
+    QListView lays every loaded row out again whenever one changes, so the
+    wrapped heights are cached and a streamed row only measures itself.
+    """
+
+    Margin = 10
+    CacheSize = 1024
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.Heights = OrderedDict()  # (text, width, font) -> row height, least recently used first
+
+    def TextRect(self, Width):
+        return QRect(self.Margin, self.Margin, max(1, Width - 2 * self.Margin), 1 << 20)
+
+    def sizeHint(self, option, index):
+        Width = self.parent().viewport().width()
+        Key = (index.data(), Width, option.font.key())
+        Height = self.Heights.get(Key)
+        if Height is None:
+            Height = option.fontMetrics.boundingRect(self.TextRect(Width), Qt.TextWordWrap, index.data()).height() + self.Margin
+            self.Heights[Key] = Height
+            if len(self.Heights) > self.CacheSize:
+                self.Heights.popitem(last=False)
+        else:
+            self.Heights.move_to_end(Key)
+        return QSize(Width, Height)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setFont(option.font)
+        painter.setPen(QColor("White"))
+        painter.drawText(self.TextRect(option.rect.width()).translated(option.rect.topLeft()), Qt.TextWordWrap, index.data())
+        painter.restore()
+
+def AnimationState(Status):
+    if Status.startswith("Answering"):
+        return "speaking"
+    if Status.startswith(("Listening", "Thinking", "Searching", "Translating")):
+        return "listening"
+    return "idle"
+
+class SharedAnimation(QObject):
+    """One decoder and one timer for an animated GIF shown by several labels.
+
+    Frames are decoded once, on first display. Each frame is scaled once
+    per size asked for and kept until AnimationCacheBytes is used up;
+    frames past the budget are scaled each time they are shown. The timer only runs
+    while a label is visible in a window that is not minimized, at the frame
+    rate of the assistant's state. Frames are picked by elapsed time, so a
+    lower rate skips frames rather than slowing the animation down.
+    """
+
+    frameChanged = pyqtSignal()
+
+    def __init__(self, Path):
+        super().__init__()
+        self.Path = Path
+        self.Frames = None
+        self.Ends = []  # Time in ms at which each frame ends
+        self.Scaled = {}  # (width, height) -> [QPixmap or None per frame]
+        self.ScaledBytes = 0
+        self.Labels = []
+        self.Started = time.monotonic()
+        self.Timer = QTimer()
+        self.Timer.timeout.connect(self.frameChanged)
+        self.SetState(GetAssistantStatus())
+        BusBridge.changed.connect(self.onStateChanged)
+        QApplication.instance().aboutToQuit.connect(self.Close)
+
+    def Close(self):
+        self.Timer.stop()
+        self.Labels = []  # Widgets hidden while the app shuts down need no more frames
+
+    def Load(self):
+        if self.Frames is None:
+            self.Frames = []
+            Reader = QImageReader(self.Path)
+            while Reader.canRead():
+                Image = Reader.read()
+                if Image.isNull():
+                    break
+                self.Frames.append(Image)
+                self.Ends.append((self.Ends[-1] if self.Ends else 0) + (Reader.nextImageDelay() or 100))
+        return self.Frames
+
+    def onStateChanged(self, topic, value):
+        if topic == "Status":
+            self.SetState(value)
+
+    def SetState(self, Status):
+        self.Timer.setInterval(1000 // max(1, AnimationFps[AnimationState(Status)]))
+
+    def FrameIndex(self):
+        if not self.Load():
+            return None
+        Elapsed = (time.monotonic() - self.Started) * 1000 % self.Ends[-1]
+        return min(bisect.bisect_right(self.Ends, Elapsed), len(self.Frames) - 1)
+
+    def Frame(self, Index, Size):
+        Cache = self.Scaled.setdefault((Size.width(), Size.height()), [None] * len(self.Frames))
+        if Cache[Index] is not None:
+            return Cache[Index]
+        Pixmap = QPixmap.fromImage(self.Frames[Index].scaled(Size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
+        Bytes = Size.width() * Size.height() * 4
+        if self.ScaledBytes + Bytes <= AnimationCacheBytes:
+            Cache[Index] = Pixmap
+            self.ScaledBytes += Bytes
+        return Pixmap
+
+    def Watch(self, Label):
+        if Label not in self.Labels:
+            self.Labels.append(Label)
+            self.frameChanged.connect(Label.showFrame)
+        self.Refresh()
+
+    def Refresh(self):
+        """Run the timer only while some label can actually be seen."""
+        if not self.Labels:
+            return
+        Visible = any(l.isVisible() and not l.window().isMinimized() for l in self.Labels)
+        if Visible and self.Load() and not self.Timer.isActive():
+            self.Timer.start()
+        elif not Visible and self.Timer.isActive():
+            self.Timer.stop()
+
+JarvisAnimation = None
+
+def GetJarvisAnimation():
+    global JarvisAnimation
+    if JarvisAnimation is None:
+        JarvisAnimation = SharedAnimation(GraphicsDirectoryPath("Jarvis.gif"))
+    return JarvisAnimation
+
+class AnimatedLabel(QLabel):
+    """Label showing the shared assistant animation at a fixed size."""
+
+    def __init__(self, size, parent=None):
+        super().__init__(parent)
+        self.frame_size = size
+        self.shown_frame = None
+        self.animation = GetJarvisAnimation()
+        self.animation.Watch(self)
+
+    def showFrame(self):
+        if not self.isVisible():
+            return
+        index = self.animation.FrameIndex()
+        if index is not None and index != self.shown_frame:
+            self.shown_frame = index
+            self.setPixmap(self.animation.Frame(index, self.frame_size))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.animation.Refresh()
+        self.showFrame()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.animation.Refresh()
 
 class ChatSection(QWidget):
     def __init__(self):
@@ -79,30 +336,26 @@ class ChatSection(QWidget):
         layout.setContentsMargins(-10, 40, 40, 100)
         layout.setSpacing(-100)
 
-        self.chat_text_edit = QTextEdit()
-        self.chat_text_edit.setReadOnly(True)
-        self.chat_text_edit.setTextInteractionFlags(Qt.NoTextInteraction)  # No text interaction
-        self.chat_text_edit.setFrameStyle(QFrame.NoFrame)
-        layout.addWidget(self.chat_text_edit)
+        self.chat_model = ChatModel()
+        self.chat_list = QListView()
+        self.chat_list.setModel(self.chat_model)
+        self.chat_list.setItemDelegate(ChatDelegate(self.chat_list))
+        self.chat_list.setResizeMode(QListView.Adjust)  # Re-wrap messages when the width changes
+        self.chat_list.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.chat_list.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.chat_list.setSelectionMode(QListView.NoSelection)
+        self.chat_list.setFocusPolicy(Qt.NoFocus)
+        self.chat_list.setFrameStyle(QFrame.NoFrame)
+        layout.addWidget(self.chat_list)
         self.setStyleSheet("background-color: black;")
         self.setSizePolicy(QSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding))
         layout.setStretch(1, 1)
 
-        text_color = QColor(Qt.blue)
-        text_color_text = QTextCharFormat()
-        text_color_text.setForeground(text_color)
-        self.chat_text_edit.setCurrentCharFormat(text_color_text)
-
-        self.gif_label = QLabel()
-        self.gif_label.setStyleSheet("border: none;")
-        movie = QMovie(GraphicsDirectoryPath("Jarvis.gif"))
-
         max_gif_size_W = 800
         max_gif_size_H = 400
-        movie.setScaledSize(QSize(max_gif_size_W, max_gif_size_H))
+        self.gif_label = AnimatedLabel(QSize(max_gif_size_W, max_gif_size_H))
+        self.gif_label.setStyleSheet("border: none;")
         self.gif_label.setAlignment(Qt.AlignRight | Qt.AlignBottom)
-        self.gif_label.setMovie(movie)
-        movie.start()
 
         layout.addWidget(self.gif_label)
 
@@ -113,14 +366,14 @@ class ChatSection(QWidget):
 
         font = QFont()
         font.setPointSize(13)
-        self.chat_text_edit.setFont(font)
-
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadMessages)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(200)  # Adjusting the timer interval to 200ms
-
-        self.chat_text_edit.viewport().installEventFilter(self)
+        self.chat_list.setFont(font)
+
+        BusBridge.changed.connect(self.onStateChanged)
+        BusBridge.streamed.connect(self.onStreamed)
+        self.chat_list.verticalScrollBar().valueChanged.connect(self.onScrolled)
+        self.label.setText(GetAssistantStatus())
+        self.loadMessages(Bus.Get("Responses"))  # Text published before the window existed
+        QTimer.singleShot(0, self.chat_list.scrollToBottom)
         self.setStyleSheet("""
             QScrollBar:vertical{
                 border:none;
@@ -148,19 +401,33 @@ class ChatSection(QWidget):
             }
         """)
 
-    def loadMessages(self):
-        global old_chat_message
-        with open(TempDirectoryPath('Responses.data'), "r", encoding='utf-8') as file:
-            messages = file.read()
-
-        if messages != old_chat_message:
-            self.addMessage(message=messages, color='White')
-            old_chat_message = messages
-
-    def SpeechRecogText(self):
-        with open(TempDirectoryPath('Status.data'), "r", encoding="utf-8") as file:
-            status = file.read()
-            self.label.setText(status)
+    def onStateChanged(self, topic, value):
+        if topic == "Responses":
+            self.loadMessages(value)
+        elif topic == "Status":
+            self.label.setText(value)
+
+    def loadMessages(self, messages):
+        if messages:
+            self.followNewMessages(lambda: self.chat_model.Append(messages))
+
+    def onStreamed(self, stream, text, done):
+        self.followNewMessages(lambda: self.chat_model.Stream(stream, text, done))
+
+    def followNewMessages(self, update):
+        """Apply a model update, staying scrolled to the bottom if the chat was there."""
+        scroll_bar = self.chat_list.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum() - 20
+        update()  # The model's dataChanged or rowsInserted makes the view fit the changed row.
+        if at_bottom:
+            QTimer.singleShot(0, self.chat_list.scrollToBottom)
+
+    def onScrolled(self, value):
+        if value == self.chat_list.verticalScrollBar().minimum():
+            added = self.chat_model.LoadOlder()
+            if added:
+                # Keep the message that was at the top in place above the newly loaded page.
+                self.chat_list.scrollTo(self.chat_model.index(added), QListView.PositionAtTop)
 
     def load_icon(self, path, width=60, height=60):
         pixmap = QPixmap(path)
@@ -177,18 +444,6 @@ class ChatSection(QWidget):
 
         self.toggled = not self.toggled
 
-    def addMessage(self, message, color):
-        cursor = self.chat_text_edit.textCursor()
-        format = QTextCharFormat()
-        formatm = QTextBlockFormat()
-        formatm.setTopMargin(10)
-        formatm.setLeftMargin(10)
-        format.setForeground(QColor(color))
-        cursor.setCharFormat(format)
-        cursor.setBlockFormat(formatm)
-        cursor.insertText(message + "\n")
-        self.chat_text_edit.setTextCursor(cursor)
-
 class InitialScreen(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -197,13 +452,9 @@ class InitialScreen(QWidget):
         screen_height = desktop.screenGeometry().height()  # type: ignore
         content_layout = QVBoxLayout()
         content_layout.setContentsMargins(0, 0, 0, 0)
-        gif_label = QLabel()
-        movie = QMovie(GraphicsDirectoryPath('Jarvis.gif'))
-        gif_label.setMovie(movie)
         max_gif_size_H = int(screen_width)
-        movie.setScaledSize(QSize(screen_width, max_gif_size_H))
+        gif_label = AnimatedLabel(QSize(screen_width, max_gif_size_H))
         gif_label.setAlignment(Qt.AlignCenter)  # type: ignore
-        movie.start()
         gif_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
         self.icon_label = QLabel()
@@ -226,14 +477,12 @@ class InitialScreen(QWidget):
         self.setFixedHeight(screen_height)
         self.setFixedWidth(screen_width)
         self.setStyleSheet("background-color: black;")
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(5)
+        BusBridge.changed.connect(self.onStateChanged)
+        self.label.setText(GetAssistantStatus())
 
-    def SpeechRecogText(self):
-        with open(TempDirectoryPath('Status.data'), "r", encoding="utf-8") as file:
-            messages = file.read()
-            self.label.setText(messages)
+    def onStateChanged(self, topic, value):
+        if topic == "Status":
+            self.label.setText(value)
 
     def load_icon(self, path, width=60, height=60):
         pixmap = QPixmap(path)
@@ -396,10 +645,16 @@ class MainWindow(QMainWindow):
         self.setMenuWidget(top_bar)
         self.setCentralWidget(stacked_widget)
 
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            GetJarvisAnimation().Refresh()  # Pause the animation while minimized
+
 def GraphicalUserInterface():
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    Bus.Publish("Gui", "Shown")
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
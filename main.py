@@ -1,29 +1,38 @@
-import subprocess
 import threading
-import json
-import os
+import queue
 import asyncio
-from time import sleep
+import time
 from dotenv import dotenv_values
 
-from Frontend.Gui import (
-    GraphicalUserInterface,
-    SetAssistantStatus,
-    ShowTextToScreen,
-    TempDirectoryPath,
-    SetMicrophoneStatus,
-    AnswerModifier,
-    QueryModifier,
-    GetMicrophoneStatus,
-    GetAssistantStatus
-)
-
-from Backend.Model import FirstLayerDMM
-from Backend.RealTimeSearchEngine import RealtimeSearchEngine
-from Backend.SpeechToText import SpeechRecognition
-from Backend.Chatbot import ChatBot
-from Backend.TextToSpeech import TextToSpeech
-from CommandInterpreter import TranslateAndExecute
+from Backend.Startup import Report, LazyModule, LoadAll, LoadInBackground
+
+with Report.Phase("import Frontend.Gui"):
+    from Frontend.Gui import (
+        GraphicalUserInterface,
+        SetAssistantStatus,
+        ShowTextToScreen,
+        ShowStreamToScreen,
+        TempDirectoryPath,
+        SetMicrophoneStatus,
+        AnswerModifier,
+        QueryModifier,
+        GetMicrophoneStatus,
+        WaitForMicrophoneStatus
+    )
+
+from Backend.ChatLogStore import ChatLog
+from Backend.TaskDispatcher import Dispatch, AnswerKinds, AnswerTimeout
+from Backend.Tracing import NewTurn, StartTurn
+
+# Heavy backends are imported on first use, or in the background while the GUI starts.
+Model = LazyModule("Backend.Model", Label="decisions")
+Search = LazyModule("Backend.RealTimeSearchEngine", Label="search")
+# Warm up the recognizer and synthesize canned phrases as soon as they are loaded.
+Speech = LazyModule("Backend.SpeechBackends", Label="speech", Init=lambda m: m.StartRecognitionSession())
+Chat = LazyModule("Backend.Chatbot", Label="chat")
+Voice = LazyModule("Backend.TextToSpeech", Label="voice", Init=lambda m: m.StartPrewarm(PrewarmedPhrases))
+Commands = LazyModule("CommandInterpreter", Label="commands")
+Backends = [Speech, Voice, Model, Chat, Search, Commands]
 
 
 # Load environment variables
@@ -31,147 +40,227 @@ env_vars = dotenv_values(".env")
 Username = env_vars.get("Username", "User")
 Assistantname = env_vars.get("Assistantname", "Assistant")
 DefaultMessage = f"{Username}\n{Assistantname} : Welcome {Username}. I am doing well. How may I help you?"
+# Phrases spoken often enough to synthesize ahead of time: the welcome line and command confirmations.
+CommonApps = [a.strip() for a in env_vars.get("PrewarmApps", "chrome,youtube,notepad,spotify,whatsapp").split(",") if a.strip()]
+PrewarmedPhrases = [f"Welcome {Username}. I am doing well. How may I help you?"] + [f"Opening {app}." for app in CommonApps]
+
+# Speak answers while they are being generated instead of after the full response.
+StreamingMode = env_vars.get("StreamingMode", "True").lower() == "true"
+StreamRefreshSeconds = 0.05  # Shortest gap between chat updates of a streamed answer
+# Listen for the next turn while the previous answer plays, and stop playback when the user speaks.
+# Opt-in: without echo cancellation the recognizer hears the assistant's own voice and interrupts it.
+OverlapListening = env_vars.get("OverlapListening", "False").lower() == "true"
+# Show the GUI first and load the backends behind it in parallel.
+LazyStartup = env_vars.get("LazyStartup", "True").lower() == "true"
 
 subprocesses = []
-Functions = {"open", "close", "play", "system", "content", "google search", "youtube search", "notepad", "weather"}
+Functions = {"open", "close", "play", "system", "content", "google search", "youtube search", "notepad", "generate image", "reminder"}
 
 def ShowDefaultChatIfNoChats():
-    with open(r'Data\ChatLog.json', "r", encoding='utf-8') as file:
-        if len(file.read()) < 5:
-            with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
-                file.write("")
-            with open(TempDirectoryPath('Responses.data'), 'w', encoding='utf-8') as file:
-                file.write(DefaultMessage)
-
-def ReadChatLogJson():
-    with open(r'Data\ChatLog.json', 'r', encoding='utf-8') as file:
-        chatlog_data = json.load(file)
-    return chatlog_data
-
-def ChatLogIntegration():
-    json_data = ReadChatLogJson()
-    formatted_chatlog = ""
-    for entry in json_data:
-        if entry["role"] == "user":
-            formatted_chatlog += f"User: {entry['content']}\n"
-    formatted_chatlog = formatted_chatlog.replace("User", Username + " ")
-    formatted_chatlog = formatted_chatlog.replace("Assistant", Assistantname + " ")
-
-    with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
-        file.write(AnswerModifier(formatted_chatlog))
-
-def ShowChatsOnGUI():
-    with open(TempDirectoryPath('Database.data'), "r", encoding='utf-8') as file:
-        Data = file.read()
-    if len(str(Data)) > 0:
-        lines = Data.split('\n')
-        result = '\n'.join(lines)
-        with open(TempDirectoryPath('Responses.data'), 'w', encoding='utf-8') as file:
-            file.write(result)
+    if len(ChatLog) == 0:
+        with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
+            file.write("")
+        ShowTextToScreen(DefaultMessage)
 
 def InitialExecution():
     SetMicrophoneStatus("False")
     ShowTextToScreen("")
-    ShowDefaultChatIfNoChats()
-    ChatLogIntegration()
-    ShowChatsOnGUI()
+    ShowDefaultChatIfNoChats()  # Earlier history is paged in by the chat view itself.
 
 InitialExecution()
 
-def MainExecution():
-    TaskExecution = False
-    ImageExecution = False
-    ImageGenerationQuery = ""
+class AnswerStream:
+    """An answer generated in its own thread, buffered until it is spoken.
 
-    SetAssistantStatus("Listening...")
-    Query = SpeechRecognition()
+    The answer is shown as it is generated, even if it is never
+    spoken (barge-in) or speech stops waiting for it after Timeout seconds.
+    """
+
+    def __init__(self, Tokens, Timeout=None):
+        self.Parts = []
+        self.Feed = queue.Queue()
+        self.Deadline = time.monotonic() + Timeout if Timeout else None
+        self.Generation = asyncio.ensure_future(asyncio.to_thread(self._generate, Tokens))
+
+    def _generate(self, Tokens):
+        Shown = 0.0
+        try:
+            for Token in Tokens:
+                self.Parts.append(Token)
+                self.Feed.put(Token)
+                if time.monotonic() - Shown >= StreamRefreshSeconds:
+                    ShowStreamToScreen(id(self), self.Text())
+                    Shown = time.monotonic()
+        finally:
+            self.Feed.put(None)
+            ShowStreamToScreen(id(self), self.Text(), Done=True)
+
+    def Text(self):
+        return f"{Assistantname} : {AnswerModifier(''.join(self.Parts).strip())}"
+
+    def Remaining(self):
+        return None if self.Deadline is None else max(0, self.Deadline - time.monotonic())
+
+    def Spoken(self):
+        while True:
+            try:
+                Token = self.Feed.get(timeout=self.Remaining())
+            except queue.Empty:
+                return
+            if Token is None:
+                return
+            yield Token
+
+    async def Speak(self):
+        SetAssistantStatus("Answering...")
+        Speech.BargeIn.Start()
+        await Voice.StreamingTextToSpeech(self.Spoken(), Speech.BargeIn)
+        try:
+            await asyncio.wait_for(asyncio.shield(self.Generation), self.Remaining())
+        except asyncio.TimeoutError:
+            pass
+        return "".join(self.Parts)
+
+async def SpeakAnswer(Text):
+    SetAssistantStatus("Answering...")
+    Speech.BargeIn.Start()
+    await Voice.TextToSpeech(Text, Speech.BargeIn)
+
+async def RunTask(Task):
+    """Start one decided task; returns an AnswerStream or the text to say."""
+    Kind, _, Text = Task.partition(" ")
+    if Kind in AnswerKinds:
+        Realtime = Kind == "realtime"
+        Query = QueryModifier(Text)
+        if StreamingMode:
+            return AnswerStream(Search.RealtimeSearchEngineStream(Query) if Realtime else Chat.ChatBotStream(Query), AnswerTimeout)
+        return await asyncio.to_thread(Search.RealtimeSearchEngine if Realtime else Chat.ChatBot, Query)
+    Results = await Commands.TranslateAndExecute([Task])
+    return "\n".join(str(r) for r in Results or [] if r)
+
+async def SpeakResults(Results):
+    """Show and speak dispatched results in order; after a barge-in they are only shown."""
+    async for Task, Result in Results:
+        if isinstance(Result, Exception):
+            print(f"Task {Task!r} failed: {Result}")
+            continue
+        Interrupted = Speech.BargeIn.Triggered.is_set()
+        if isinstance(Result, AnswerStream):
+            if not Interrupted:
+                await Result.Speak()
+        elif Result:
+            ShowTextToScreen(f"{Assistantname} : {Result}")
+            if not Interrupted:
+                await SpeakAnswer(Result)
+
+async def ListenAsync():
+    # After a barge-in the offline engine starts from the audio that interrupted the answer.
+    return await asyncio.to_thread(
+        Speech.SpeechRecognition,
+        OnPartial=lambda Text: SetAssistantStatus(f"Listening... {Text}"),
+        Preroll=Speech.BargeIn.TakePreroll(),
+    )
+
+async def ProcessQuery(Query):
+    """Classify a query and start every task it was decided into.
+
+    Returns the coroutine that speaks the results (or None), so the caller
+    can start listening for the next turn while it plays.
+    """
     ShowTextToScreen(f"{Username} : {Query}")
     SetAssistantStatus("Thinking...")
-    Decision = FirstLayerDMM(Query)
+    Decision = await asyncio.to_thread(Model.FirstLayerDMM, Query)
 
     print(f"\nQuery: {Query}")
     print(f"Decision : {Decision}\n")
 
-    G = any(i.startswith("general") for i in Decision)
-    R = any(i.startswith("realtime") for i in Decision)
+    # Commands, chats and searches all start at once and are answered in the order they were asked.
+    Tasks = [t for t in Decision if t.startswith(AnswerKinds) or t.startswith(tuple(Functions))]
+    if not Tasks:
+        return None
+    SetAssistantStatus("Searching..." if any(t.startswith("realtime") for t in Tasks) else "Thinking...")
+    Speech.BargeIn.Triggered.clear()
+    return SpeakResults(Dispatch(Tasks, RunTask))
 
-    Merged_query = " and ".join(
-        [" ".join(i.split()[1:]) for i in Decision if i.startswith("general") or i.startswith("realtime")]
-    )
-   # Check for command interpreter execution in both Query and Decision
-    cmd_executed = False
-    for func in Functions:
-        if func in Query.lower():
-            response = asyncio.run(TranslateAndExecute([Query]))
-            # If response is a list (from asyncio.gather), join it
-            if isinstance(response, list):
-                response_text = "\n".join(str(r) for r in response if r)
-            else:
-                response_text = str(response)
-            ShowTextToScreen(f"{Assistantname} : {response_text}")
-            SetAssistantStatus("Answering...")
-            asyncio.run(TextToSpeech(response_text))
-            cmd_executed = True
-            break
-
-    if not cmd_executed:
-        for query in Decision:
-            if any(func in query for func in Functions):
-                response = asyncio.run(TranslateAndExecute([Query]))
-                if isinstance(response, list):
-                    response_text = "\n".join(str(r) for r in response if r)
-                else:
-                    response_text = str(response)
-                ShowTextToScreen(f"{Assistantname} : {response_text}")
-                SetAssistantStatus("Answering...")
-                asyncio.run(TextToSpeech(response_text))
-                cmd_executed = True
-                break
-
-    if cmd_executed:
-        return True
-    if G and R or R:
-        SetAssistantStatus("Searching...")
-        Answer = RealtimeSearchEngine(QueryModifier(Merged_query))
-        ShowTextToScreen(f"{Assistantname} : {Answer}")
-        SetAssistantStatus("Answering...")
-        asyncio.run(TextToSpeech(Answer))
-        return True
-    else:
-        for Queries in Decision:
-            if "general" in Queries:
-                SetAssistantStatus("Thinking...")
-                QueryFinal = Queries.replace("general ", "")
-                Answer = ChatBot(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering...")
-                asyncio.run(TextToSpeech(Answer))
-                return True
-            elif "realtime" in Queries:
-                SetAssistantStatus("Searching...")
-                QueryFinal = Queries.replace("realtime ", "")
-                Answer = RealtimeSearchEngine(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering...")
-                asyncio.run(TextToSpeech(Answer))
-                os._exit(1)
-
-def FirstThread():
+async def MainExecutionAsync():
+    NewTurn()
+    SetAssistantStatus("Listening...")
+    Query = await ListenAsync()
+    if not Query:
+        return False
+    Turn = StartTurn(chars=len(Query))
+    await SpeakThenListen(await ProcessQuery(Query), Turn)
+    return True
+
+def MainExecution():
+    return asyncio.run(MainExecutionAsync())
+
+async def SpeakThenListen(Reply, Turn):
+    """Speak a turn's reply, then close the turn's trace span."""
+    try:
+        if Reply is not None:
+            await Reply
+    except asyncio.CancelledError:
+        Turn.Set(interrupted=True)
+        raise
+    finally:
+        Turn.End()
+    if GetMicrophoneStatus() == "True":
+        SetAssistantStatus("Listening...")
+
+async def TurnLoop():
+    """Run turns on one long-lived event loop.
+
+    Each turn listens, classifies, then executes or answers. With
+    OverlapListening the next turn starts listening while the previous
+    answer is still playing, and playback is cancelled as soon as the user
+    says something (barge-in).
+    """
+    Speaking = None
     while True:
-        CurrentStatus = GetMicrophoneStatus()
-        if CurrentStatus == "True":
-            MainExecution()
-        else:
-            AIStatus = GetAssistantStatus()
-            if "Available .." in AIStatus:
-                sleep(0.1)
-            else:
+        if GetMicrophoneStatus() != "True":
+            if Speaking is None or Speaking.done():
                 SetAssistantStatus("Available..")
+            await asyncio.to_thread(WaitForMicrophoneStatus, "True")  # Sleep until the mic button is toggled on.
+            continue
+
+        if Speaking is not None and not OverlapListening:
+            await asyncio.gather(Speaking, return_exceptions=True)
+        if Speaking is None or Speaking.done():
+            SetAssistantStatus("Listening...")
+
+        NewTurn()
+        Query = await ListenAsync()
+        if Speaking is not None and not Speaking.done() and Query:
+            Speaking.cancel()  # The user spoke over the answer.
+        if not Query:
+            continue
+
+        Turn = StartTurn(chars=len(Query))
+        try:
+            Reply = await ProcessQuery(Query)
+        except Exception as e:
+            print(f"Error processing query: {e}")
+            Turn.End(e)
+            continue
+        Speaking = asyncio.create_task(SpeakThenListen(Reply, Turn))
+
+def FirstThread(Ready=None):
+    if Ready is not None:
+        Ready.wait()  # Turns start once every backend has loaded.
+    asyncio.run(TurnLoop())
 
 def SecondThread():
     GraphicalUserInterface()
 
 if __name__ == "__main__":
-    thread2 = threading.Thread(target=FirstThread, daemon=True)
+    Report.Mark("main imported")
+    if LazyStartup:
+        Ready = LoadInBackground(Backends)
+    else:
+        LoadAll(Backends)
+        print(Report.Format())
+        Ready = None
+    thread2 = threading.Thread(target=FirstThread, args=(Ready,), daemon=True)
     thread2.start()
     SecondThread()
\ No newline at end of file
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Modules read .env and create Data/ in the working directory on import; keep that out of the checkout.
+os.chdir(tempfile.mkdtemp(prefix="jarvis-tests-"))
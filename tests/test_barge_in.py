@@ -0,0 +1,77 @@
+import time
+import logging
+import threading
+import unittest
+from array import array
+
+from Backend import SpeechBackends
+from Backend.SpeechBackends import BargeInMonitor, SpeechBackend, SampleRate, FrameMs
+
+Silence = array("h", [0] * (SampleRate * FrameMs // 1000)).tobytes()
+Loud = array("h", [12000, -12000] * (SampleRate * FrameMs // 2000)).tobytes()
+
+class SharedFrames(SpeechBackend):
+    """One endless frame source for every monitor, like a WAV fixture shared with the recognizer."""
+
+    def __init__(self):
+        self.Speaking = False
+        self._frames = self._generate()
+
+    def _generate(self):
+        while True:
+            time.sleep(FrameMs / 1000)
+            yield Loud if self.Speaking else Silence
+
+    def Frames(self):
+        return self._frames
+
+def MonitorThreads():
+    return [t for t in threading.enumerate() if t.name.startswith("Thread") and "_run" in t.name]
+
+class BargeInMonitorTests(unittest.TestCase):
+    def setUp(self):
+        self.Previous = SpeechBackends.ActiveBackend
+        self.Backend = SpeechBackends.ActiveBackend = SharedFrames()
+
+    def tearDown(self):
+        SpeechBackends.ActiveBackend = self.Previous
+
+    def test_restart_leaves_one_monitor_running(self):
+        Monitor = BargeInMonitor(Enabled=True)
+        with self.assertNoLogs(level=logging.ERROR):
+            for _ in range(5):
+                Monitor.Start()
+                Monitor.Stop()
+            Monitor.Start()
+            time.sleep(0.1)
+            self.assertEqual(len(MonitorThreads()), 1)
+            Monitor.Stop()
+        self.assertEqual(MonitorThreads(), [])
+
+    def test_failing_frame_source_disables_the_monitor(self):
+        def Broken():
+            raise ImportError("No module named 'sounddevice'")
+            yield
+        self.Backend.Frames = Broken
+        Monitor = BargeInMonitor(Enabled=True)
+        with self.assertLogs(level=logging.ERROR) as Logs:
+            Monitor.Start()
+            Monitor._thread.join(2)
+            Monitor.Stop()
+            for _ in range(3):
+                Monitor.Start()
+                Monitor.Stop()
+        self.assertEqual(len(Logs.records), 1)
+        self.assertFalse(Monitor.Enabled)
+
+    def test_speech_stops_playback(self):
+        Monitor = BargeInMonitor(Enabled=True)
+        Monitor.Start()
+        self.assertTrue(Monitor())
+        self.Backend.Speaking = True
+        self.assertTrue(Monitor.Triggered.wait(2))
+        self.assertFalse(Monitor())
+        Monitor(False)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import asyncio
+import unittest
+
+from Backend.CommandRegistry import CommandRegistry
+
+class CommandRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.Registry = CommandRegistry(Workers=2, Processes=1)
+        self.Registry.Register("open")(lambda app: f"open {app}")
+        self.Registry.Register("open youtube", Exact=True)(lambda _: "youtube")
+
+    def Run(self, Command):
+        return asyncio.run(self.Registry.Run(Command))
+
+    def test_longest_prefix_wins(self):
+        self.assertEqual(self.Run("open youtube"), "youtube")
+        self.assertEqual(self.Run("open notepad"), "open notepad")
+
+    def test_exact_handler_leaves_longer_commands_to_the_prefix(self):
+        self.assertEqual(self.Run("open youtube music"), "open youtube music")
+
+    def test_unknown_command_has_no_reply(self):
+        with self.assertLogs(level="ERROR"):
+            self.assertIsNone(self.Run("fly to the moon"))
+
+if __name__ == "__main__":
+    unittest.main()
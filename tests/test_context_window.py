@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from Backend.ChatLogStore import ChatLogStore
+from Backend.ContextWindow import ContextWindow, ExtractiveSummary
+
+System = [{"role": "system", "content": "You are a helpful assistant."}]
+Query = {"role": "user", "content": "And what next?"}
+
+class ContextWindowTests(unittest.TestCase):
+    def setUp(self):
+        Path = os.path.join(tempfile.mkdtemp(), "ChatLog.jsonl")
+        self.Store = ChatLogStore(Path, LegacyPath=None, TailSize=50)
+
+    def Say(self, Start, Stop):
+        for i in range(Start, Stop):
+            self.Store.Append("user" if i % 2 == 0 else "assistant", f"Message number {i}.")
+
+    def test_messages_older_than_the_tail_are_summarized(self):
+        self.Say(0, 60)
+        Window = ContextWindow(Store=self.Store, Budget=6000, SummaryBudget=2000)
+        Prompt = Window.Build(System, Query)
+        for i in range(10):
+            self.assertIn(f"Message number {i}.", Window.Summary)
+        self.assertNotIn("Message number 10.", Window.Summary)
+        self.assertEqual(len(Prompt), len(System) + 1 + 50 + 1)
+
+    def test_summary_grows_incrementally_without_repeats(self):
+        self.Say(0, 60)
+        Window = ContextWindow(Store=self.Store, Budget=6000, SummaryBudget=2000)
+        Window.Build(System, Query)
+        self.Say(60, 70)
+        Window.Build(System, Query)
+        Lines = Window.Summary.split("\n")
+        self.assertEqual(len(Lines), 20)
+        self.assertEqual(len(set(Lines)), 20)
+        self.assertIn("Message number 19.", Window.Summary)
+
+    def test_messages_over_the_budget_are_summarized(self):
+        self.Say(0, 20)
+        Window = ContextWindow(Store=self.Store, Budget=120, SummaryBudget=40)
+        Prompt = Window.Build(System, Query)
+        Kept = [m["content"] for m in Prompt if m["role"] != "system"]
+        self.assertIn("Message number 19.", Kept)
+        self.assertIn("Message number", Window.Summary)
+        self.assertNotIn(Window.Summary.split("\n")[-1].split(": ", 1)[1], Kept)
+
+    def test_first_build_reads_back_only_what_fits_in_the_summary(self):
+        self.Say(0, 4000)
+        Window = ContextWindow(Store=self.Store, Budget=6000, SummaryBudget=400)
+        Pages = []
+        Page = self.Store.Page
+        self.Store.Page = lambda Start, Stop: Pages.append(Stop - Start) or Page(Start, Stop)
+        Window.Build(System, Query)
+        self.assertLessEqual(max(Pages), 400)
+        self.assertEqual(Window.Summary, ExtractiveSummary("", Page(0, 3950), 400))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from Backend.IntentClassifier import ClassifyLocally
+
+class IntentClassifierTests(unittest.TestCase):
+    def test_confident_phrasings_are_routed(self):
+        Cases = {
+            "open chrome and firefox": ["open chrome", "open firefox"],
+            "open chrome, please": ["open chrome"],
+            "close notepad and spotify, thanks": ["close notepad", "close spotify"],
+            "thanks": ["general thanks"],
+            "google search python decorators": ["google search python decorators"],
+            "search for cats on youtube": ["youtube search cats"],
+            "increase the volume": ["system increase the volume"],
+            "what's the weather today": ["realtime what's the weather today"],
+            "how is the weather in paris": ["realtime how is the weather in paris"],
+            "latest news": ["realtime latest news"],
+            "what is the temperature in delhi": ["realtime what is the temperature in delhi"],
+        }
+        for Query, Decision in Cases.items():
+            self.assertEqual(ClassifyLocally(Query), Decision, Query)
+
+    def test_lookalikes_fall_back_to_the_model(self):
+        for Query in (
+            "google chrome is slow",
+            "forecast models in statistics",
+            "temperature of the sun",
+            "what is the temperature of the sun",
+            "news anchors who became politicians",
+            "weather balloons were used in the war",
+            "open chrome, firefox",
+        ):
+            self.assertIsNone(ClassifyLocally(Query), Query)
+
+if __name__ == "__main__":
+    unittest.main()
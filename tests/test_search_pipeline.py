@@ -0,0 +1,36 @@
+import unittest
+
+from Backend import SearchPipeline
+from Benchmarks.Fakes import FakeSearchServer
+
+class NormalizeQueryTests(unittest.TestCase):
+    def test_stop_words_and_case_are_ignored(self):
+        self.assertEqual(SearchPipeline.NormalizeQuery("What is the  Weather today?"), SearchPipeline.NormalizeQuery("weather today"))
+
+    def test_word_order_is_kept(self):
+        for First, Second in [
+            ("dollar to rupee", "rupee to dollar"),
+            ("flights from delhi to mumbai", "flights from mumbai to delhi"),
+        ]:
+            with self.subTest(First=First):
+                self.assertNotEqual(SearchPipeline.NormalizeQuery(First), SearchPipeline.NormalizeQuery(Second))
+
+class SearchUrlsTests(unittest.TestCase):
+    def setUp(self):
+        self.Server = FakeSearchServer(Results=8, SearchDelay=0, PageDelay=0)
+        self.Previous = SearchPipeline.SearchEndpoint
+        SearchPipeline.SearchEndpoint = f"{self.Server.Start()}/search"
+
+    def tearDown(self):
+        SearchPipeline.SearchEndpoint = self.Previous
+        self.Server.Stop()
+
+    def test_one_link_lookup_keeps_full_results_cached(self):
+        Query = "python release notes"
+        self.assertEqual(len(SearchPipeline.RunSearch(SearchPipeline.SearchUrls(Query, 1))), 1)
+        Urls = SearchPipeline.RunSearch(SearchPipeline.SearchUrls(Query))
+        self.assertEqual(len(Urls), SearchPipeline.SearchResultCount)
+        self.assertEqual(self.Server.Requests, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from Backend.SemanticCache import SemanticCache, Features
+
+class SemanticCacheTests(unittest.TestCase):
+    def Cache(self, *Queries):
+        Cache = SemanticCache(MaxEntries=16, Threshold=0.85)
+        for Query in Queries:
+            Cache.Put(Query, Query)
+        return Cache
+
+    def test_contractions_are_spelled_out(self):
+        self.assertEqual(Features("what's the capital of india"), Features("what is the capital of india"))
+        self.assertEqual(Features("who isn't coming"), Features("who is not coming"))
+
+    def test_paraphrases_match(self):
+        Cache = self.Cache("who is the president of france", "what is the capital of india")
+        for Query, Stored in [
+            ("Who's the President of France?", "who is the president of france"),
+            ("tell me who is the president of france please", "who is the president of france"),
+            ("What's the capital of India?", "what is the capital of india"),
+            ("can you tell me what is the capital of india", "what is the capital of india"),
+        ]:
+            with self.subTest(Query=Query):
+                self.assertEqual(Cache.Get(Query), Stored)
+
+    def test_near_misses_do_not_match(self):
+        Cache = self.Cache("who is the president of france", "what is the capital of india")
+        for Query in [
+            "who was the president of france",
+            "who will be the president of france",
+            "who is not the president of france",
+            "who isn't the president of france",
+            "who is the president of finland",
+            "what was the capital of india",
+            "what is the capital of indonesia",
+        ]:
+            with self.subTest(Query=Query):
+                self.assertIsNone(Cache.Get(Query))
+
+if __name__ == "__main__":
+    unittest.main()